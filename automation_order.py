@@ -8,14 +8,22 @@ from selenium.common.exceptions import NoSuchElementException
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException
+from selenium.common.exceptions import WebDriverException
 from apify_client import ApifyClientAsync
 from apify_client._errors import ApifyApiError
 from typing import Optional, Tuple
 from google.auth.exceptions import TransportError
 from google.oauth2 import service_account
+from cachetools import TTLCache
+from order_parser import get_od_info, build_order_list, parse_order_table
+from service_catalog import ServiceCatalog, ServiceCatalogManager, classify_service
+from log_utils import get_logger, setup_logger, summarize
+from instrumentation import span, span_recorder
+from metrics import record_orders
 
 import re
 import os
+import asyncio
 import time
 import gspread
 import pandas as pd
@@ -23,10 +31,16 @@ import traceback
 import requests
 import json
 import backoff
+import httpx
+import sqlite3
+import threading
+import atexit
 
 # .env 파일 로드
 load_dotenv()
 
+logger = get_logger('automation_order')
+
 # 환경 변수 사용
 # mall_id = os.getenv("MALL_ID")
 username = os.getenv("USERNAME")
@@ -47,17 +61,497 @@ store_api_key = os.getenv("STORE_API_KEY").strip('"').strip()
 store_basic_url = os.getenv("STORE_BASIC_URL").strip('"').strip()
 make_hook_url = os.getenv("MAKE_HOOK_URL")
 
+# 브라우저 세션 재사용 설정 (N 주기마다 또는 JS 힙이 커지면 브라우저 재시작)
+driver_max_cycles = int(os.getenv("DRIVER_MAX_CYCLES", "24"))
+driver_max_heap_mb = int(os.getenv("DRIVER_MAX_HEAP_MB", "512"))
+
+# 주문 목록 추출 방식 (script: execute_script 한 번으로 추출, html: page_source를 파이썬에서 파싱)
+scrape_mode = os.getenv("SCRAPE_MODE", "script")
+
+# 검증 동시 실행 설정
+validation_concurrency = int(os.getenv("VALIDATION_CONCURRENCY", "8"))
+apify_batch_size = int(os.getenv("APIFY_BATCH_SIZE", "50"))
+actor_default_concurrency = int(os.getenv("ACTOR_DEFAULT_CONCURRENCY", "2"))
+actor_concurrency = {
+    actor_insta_profile: int(os.getenv("ACTOR_PROFILE_INSTA_CONCURRENCY", actor_default_concurrency)),
+    actor_insta_post: int(os.getenv("ACTOR_POST_INSTA_CONCURRENCY", actor_default_concurrency)),
+    actor_youtube_channel: int(os.getenv("ACTOR_YOUTUBE_CHANNEL_CONCURRENCY", actor_default_concurrency)),
+    actor_youtube_video: int(os.getenv("ACTOR_YOUTUBE_VIDEO_CONCURRENCY", actor_default_concurrency)),
+}
+
+# 검증 결과 캐시 설정 (종류별 유효기간, 초)
+validation_cache_size = int(os.getenv("VALIDATION_CACHE_SIZE", "2048"))
+validation_cache_ttls = {
+    'profile': int(os.getenv("VALIDATION_TTL_PROFILE", "21600")),
+    'latest_post': int(os.getenv("VALIDATION_TTL_LATEST_POST", "600")),
+    'post': int(os.getenv("VALIDATION_TTL_POST", "3600")),
+    'channel': int(os.getenv("VALIDATION_TTL_CHANNEL", "21600")),
+    'video': int(os.getenv("VALIDATION_TTL_VIDEO", "3600")),
+    'shorts': int(os.getenv("VALIDATION_TTL_SHORTS", "3600")),
+}
+
+# 로컬 저장소 경로 (logs 디렉토리와 같은 방식으로 앱 디렉토리 아래 생성)
+app_data_dir = os.getenv("APP_DATA_DIR", "data")
+validation_store_path = os.path.join(app_data_dir, 'validation_results.sqlite3')
+validation_store_max_rows = int(os.getenv("VALIDATION_STORE_MAX_ROWS", "20000"))
+order_ledger_path = os.path.join(app_data_dir, 'order_ledger.sqlite3')
+order_ledger_retention_days = int(os.getenv("ORDER_LEDGER_RETENTION_DAYS", "30"))
+
+# 수동주문 알림 (digest: 주기마다 새 주문을 묶어 한 번 전송, each: 주문마다 전송)
+manual_alert_mode = os.getenv("MANUAL_ALERT_MODE", "digest")
+manual_alert_timeout = float(os.getenv("MANUAL_ALERT_TIMEOUT", "10"))
+manual_alert_store_path = os.path.join(app_data_dir, 'manual_alerts.sqlite3')
+cafe24_cookie_path = os.getenv("CAFE24_COOKIE_PATH", os.path.join(app_data_dir, 'cafe24_cookies.json'))
+
+# 스토어 API 연결 설정 (연결 풀 크기, 타임아웃 초, 일시 오류 재시도 횟수)
+store_pool_size = int(os.getenv("STORE_POOL_SIZE", "10"))
+store_connect_timeout = float(os.getenv("STORE_CONNECT_TIMEOUT", "5"))
+store_read_timeout = float(os.getenv("STORE_READ_TIMEOUT", "30"))
+store_max_tries = int(os.getenv("STORE_MAX_TRIES", "4"))
+# 동시에 보낼 주문 생성 요청 수, 체크박스 선택 확인 대기 시간 (초)
+store_order_concurrency = int(os.getenv("STORE_ORDER_CONCURRENCY", "5"))
+order_check_timeout = float(os.getenv("ORDER_CHECK_TIMEOUT", "10"))
+
+# 주기 처리 방식 (1: 검증/주문/시트 기록 단계를 큐로 연결해 동시에 진행, 0: 단계별 일괄 처리)
+order_pipeline_enabled = os.getenv("ORDER_PIPELINE", "1") == "1"
+pipeline_queue_size = int(os.getenv("PIPELINE_QUEUE_SIZE", "20"))
+
+# 주문 전 잔액 확인 시 남겨 둘 금액 (스토어 통화 기준)
+balance_reserve = float(os.getenv("BALANCE_RESERVE", "0"))
+
+# 주문 상태 동기화 (한 번에 조회할 스토어 주문 수, 0이면 동기화하지 않음)
+status_sync_chunk_size = int(os.getenv("STATUS_SYNC_CHUNK_SIZE", "100"))
+
+# 서비스 목록 갱신 주기 (초, 리비전 셀을 쓰지 않을 때만 사용)
+catalog_refresh_interval = int(os.getenv("CATALOG_REFRESH_INTERVAL", "600"))
+# 서비스 목록 시트에서 목록을 고칠 때마다 바꾸는 리비전 셀 (예: "Z1"). 설정하면 값이 바뀔 때만 다시 내려받음
+# 스프레드시트 수정 시각은 주문 기록 때마다 바뀌므로 사용하지 않음
+catalog_revision_cell = os.getenv("CATALOG_REVISION_CELL", "")
+
+# 시트 기록 시 append_rows 한 번에 보낼 최대 행 수
+sheet_write_chunk_size = int(os.getenv("SHEET_WRITE_CHUNK_SIZE", "100"))
+
+# 수동주문 색인 전체 재적재 주기 (초, 그 사이에는 새로 추가된 행만 읽음)
+manual_index_reseed_interval = int(os.getenv("MANUAL_INDEX_RESEED_INTERVAL", "3600"))
+# 주문 상태 동기화 색인 전체 재적재 주기 (초, 그 사이에는 새로 추가된 행만 읽음)
+status_index_reseed_interval = int(os.getenv("STATUS_INDEX_RESEED_INTERVAL", "3600"))
+
 # print()
 # print(f"google: {json_str[:20]}")
 # print()
 # print(f"sheet: {sheet_key[:10]}")
 # print()
 
+# 액터별 동시 실행 제한 (같은 액터를 쓰는 검증기끼리 공유)
+_actor_semaphores = {}
+
+def get_actor_semaphore(actor_id: str) -> asyncio.Semaphore:
+    if actor_id not in _actor_semaphores:
+        _actor_semaphores[actor_id] = asyncio.Semaphore(actor_concurrency.get(actor_id, actor_default_concurrency))
+    return _actor_semaphores[actor_id]
+
+
+# 배치 결과가 없는 예약 입력 표시
+MISSING = object()
+
+
+class ValidationCache:
+    """
+    액터 검증 결과 캐시
+    - 항목마다 저장 시각을 기록하고 조회할 때 종류별 유효기간으로 판단합니다.
+    - 크기를 넘으면 가장 오래 사용하지 않은 항목부터 제거합니다.
+    - 같은 키를 동시에 조회하면 액터 실행 한 번을 함께 기다립니다.
+    """
+    def __init__(self, ttls: dict, maxsize: int):
+        self.ttls = ttls
+        self.entries = TTLCache(maxsize=maxsize, ttl=max(ttls.values()))
+        self.inflight = {}
+
+    def get(self, key: tuple, ttl_kind: str):
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        stored_at, result = entry
+        if time.monotonic() - stored_at > self.ttls[ttl_kind]:
+            return None
+        return result
+
+    def set(self, key: tuple, result):
+        self.entries[key] = (time.monotonic(), result)
+
+    def reserve(self, key: tuple):
+        """
+        배치 실행 전에 입력을 예약해 같은 키의 단건 조회가 배치 결과를 기다리도록 합니다.
+        이미 실행 중인 키면 None을 반환합니다.
+        """
+        if key in self.inflight:
+            return None
+        future = asyncio.get_running_loop().create_future()
+        self.inflight[key] = future
+        return future
+
+    def release(self, key: tuple, future, result=MISSING):
+        """예약을 풀고 기다리는 쪽에 결과를 전달합니다. (결과가 없으면 MISSING -> 단건 실행)"""
+        if self.inflight.get(key) is future:
+            self.inflight.pop(key)
+        if not future.done():
+            future.set_result(result)
+
+    async def get_or_fetch(self, key: tuple, ttl_kind: str, fetch):
+        """캐시에 없으면 fetch()를 실행해 저장합니다. fetch에서 발생한 예외는 저장하지 않고 그대로 전달합니다."""
+        result = self.get(key, ttl_kind)
+        if result is not None:
+            return result
+
+        task = self.inflight.get(key)
+        if task is not None:
+            result = await asyncio.shield(task)
+            if result is not MISSING:
+                return result
+            # 배치에서 결과를 얻지 못한 입력은 직접 실행
+            task = self.inflight.get(key)
+
+        if task is None:
+            async def fetch_and_store():
+                value = await fetch()
+                self.set(key, value)
+                return value
+
+            task = asyncio.ensure_future(fetch_and_store())
+            self.inflight[key] = task
+            task.add_done_callback(lambda _: self.inflight.pop(key, None))
+        # 먼저 요청한 쪽이 취소되어도 함께 기다리는 쪽은 결과를 받을 수 있도록 shield
+        return await asyncio.shield(task)
+
+validation_cache = ValidationCache(validation_cache_ttls, validation_cache_size)
+
+
+class ValidationStore:
+    """
+    검증 결과를 SQLite에 저장해 재시작 후에도 같은 링크의 액터 실행을 건너뜁니다.
+    - 종류별 유효기간은 validation_cache_ttls를 따릅니다.
+    - 행 수가 max_rows를 넘으면 오래된 결과부터 삭제합니다.
+    - 저장소 오류는 검증 흐름을 막지 않도록 출력만 하고 넘어갑니다.
+    """
+    # 저장 종류 -> 유효기간 종류
+    TTL_KINDS = {
+        'instagram_profile': 'profile',
+        'instagram_post': 'post',
+        'instagram_reels': 'post',
+        'instagram_latest_post': 'latest_post',
+        'instagram_latest_reels': 'latest_post',
+        'youtube_channel': 'channel',
+        'youtube_video': 'video',
+        'youtube_shorts': 'shorts',
+    }
+    PRUNE_EVERY = 100
+
+    def __init__(self, path: str, max_rows: int):
+        self.path = path
+        self.max_rows = max_rows
+        self.conn = None
+        self.writes = 0
+
+    def _connect(self):
+        if self.conn is None:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            self.conn = sqlite3.connect(self.path)
+            self.conn.row_factory = sqlite3.Row
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS validation_results (
+                    kind TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    is_valid INTEGER NOT NULL,
+                    is_private INTEGER NOT NULL DEFAULT 0,
+                    edit_link TEXT,
+                    checked_at REAL NOT NULL,
+                    PRIMARY KEY (kind, key)
+                )
+            """)
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_validation_checked_at ON validation_results (checked_at)")
+            self.conn.commit()
+        return self.conn
+
+    def get(self, kind: str, key: str) -> Optional[dict]:
+        if not key:
+            return None
+        max_age = validation_cache_ttls[self.TTL_KINDS[kind]]
+        try:
+            row = self._connect().execute(
+                "SELECT is_valid, is_private, edit_link, checked_at FROM validation_results WHERE kind = ? AND key = ? AND checked_at >= ?",
+                (kind, key, time.time() - max_age)
+            ).fetchone()
+        except sqlite3.Error as e:
+            logger.error(f"검증 결과 조회 실패: {e}")
+            return None
+        if row is None:
+            return None
+        return {
+            'is_valid': bool(row['is_valid']),
+            'is_private': bool(row['is_private']),
+            'edit_link': row['edit_link'],
+            'checked_at': row['checked_at'],
+        }
+
+    def put(self, kind: str, key: str, is_valid: bool, is_private: bool = False, edit_link: Optional[str] = None):
+        if not key:
+            return
+        try:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO validation_results (kind, key, is_valid, is_private, edit_link, checked_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (kind, key, int(bool(is_valid)), int(bool(is_private)), edit_link, time.time())
+            )
+            conn.commit()
+        except sqlite3.Error as e:
+            logger.error(f"검증 결과 저장 실패: {e}")
+            return
+
+        self.writes += 1
+        if self.writes % self.PRUNE_EVERY == 0:
+            self.prune()
+
+    def prune(self):
+        """만료된 결과와 max_rows를 넘는 오래된 결과를 삭제합니다."""
+        try:
+            conn = self._connect()
+            conn.execute(
+                "DELETE FROM validation_results WHERE checked_at < ?",
+                (time.time() - max(validation_cache_ttls.values()),)
+            )
+            conn.execute(
+                "DELETE FROM validation_results WHERE rowid NOT IN (SELECT rowid FROM validation_results ORDER BY checked_at DESC LIMIT ?)",
+                (self.max_rows,)
+            )
+            conn.commit()
+        except sqlite3.Error as e:
+            logger.error(f"검증 결과 정리 실패: {e}")
+
+validation_store = ValidationStore(validation_store_path, validation_store_max_rows)
+
+
+class OrderLedger:
+    """
+    마켓주문번호별 스토어 주문 기록 (SQLite)
+    - pending: 주문 생성 요청 직전에 기록 (결과를 아직 모름)
+    - placed: 스토어 주문번호를 받음
+    - recorded: 주문 시트에 기록함
+    - shipped: 카페24 배송처리까지 요청함
+    재시도나 재시작 시 placed 이후의 주문은 다시 주문하지 않고 이어서 처리하고,
+    pending으로 남은 주문은 중복 주문을 막기 위해 수동 확인으로 보냅니다.
+    주문 전 기록(begin)이 실패하면 주문하지 않도록 예외를 그대로 올립니다.
+    """
+    PENDING = 'pending'
+    PLACED = 'placed'
+    RECORDED = 'recorded'
+    SHIPPED = 'shipped'
+    PRUNE_EVERY = 100
+
+    def __init__(self, path: str, retention_days: int):
+        self.path = path
+        self.retention_days = retention_days
+        self.conn = None
+        self.writes = 0
+        # 시트 기록 후 표시(on_written)는 flush를 실행한 스레드에서 호출될 수 있음
+        self.lock = threading.RLock()
+
+    def _connect(self):
+        if self.conn is None:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            self.conn = sqlite3.connect(self.path, check_same_thread=False)
+            self.conn.row_factory = sqlite3.Row
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS order_ledger (
+                    market_order_num TEXT PRIMARY KEY,
+                    service_num TEXT,
+                    link TEXT,
+                    quantity INTEGER,
+                    state TEXT NOT NULL,
+                    store_order_id TEXT,
+                    response TEXT,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            """)
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_order_ledger_state ON order_ledger (state)")
+            self.conn.commit()
+        return self.conn
+
+    @staticmethod
+    def _row_to_entry(row) -> dict:
+        return {
+            'market_order_num': row['market_order_num'],
+            'state': row['state'],
+            'store_order_id': row['store_order_id'],
+            'response': json.loads(row['response']) if row['response'] else None,
+            'updated_at': row['updated_at'],
+        }
+
+    def get_many(self, market_order_nums: list) -> dict:
+        """마켓주문번호 -> 기록 (기록이 없는 주문은 포함하지 않음)"""
+        entries = {}
+        with self.lock:
+            conn = self._connect()
+            for chunk in _chunks(list(market_order_nums), 500):
+                rows = conn.execute(
+                    f"SELECT * FROM order_ledger WHERE market_order_num IN ({','.join('?' * len(chunk))})",
+                    chunk
+                ).fetchall()
+                for row in rows:
+                    entries[row['market_order_num']] = self._row_to_entry(row)
+        return entries
+
+    def begin(self, order: dict, link: str):
+        """주문 생성 요청 직전에 pending으로 기록합니다. 이미 기록된 주문이면 예외를 발생시킵니다."""
+        now = time.time()
+        with self.lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT INTO order_ledger (market_order_num, service_num, link, quantity, state, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (order['market_order_num'], str(order['service_num']), link, int(order['quantity']), self.PENDING, now, now)
+            )
+            conn.commit()
+
+    def mark_placed(self, market_order_num: str, response: dict):
+        self._update(
+            "UPDATE order_ledger SET state = ?, store_order_id = ?, response = ?, updated_at = ? WHERE market_order_num = ?",
+            (self.PLACED, str(response.get('order')), json.dumps(response), time.time(), market_order_num)
+        )
+
+    def discard(self, market_order_num: str):
+        """주문되지 않은 것이 확실한 pending 기록을 지워 다음 주기에 다시 주문할 수 있게 합니다."""
+        self._update(
+            "DELETE FROM order_ledger WHERE market_order_num = ? AND state = ?",
+            (market_order_num, self.PENDING)
+        )
+
+    def mark_state(self, market_order_nums: list, state: str, from_states: tuple):
+        """from_states 상태인 주문만 state로 바꿉니다."""
+        if not market_order_nums:
+            return
+        now = time.time()
+        for chunk in _chunks(list(market_order_nums), 500):
+            self._update(
+                f"UPDATE order_ledger SET state = ?, updated_at = ? "
+                f"WHERE market_order_num IN ({','.join('?' * len(chunk))}) AND state IN ({','.join('?' * len(from_states))})",
+                (state, now, *chunk, *from_states)
+            )
+
+    def _update(self, sql: str, params: tuple):
+        with self.lock:
+            try:
+                conn = self._connect()
+                conn.execute(sql, params)
+                conn.commit()
+            except sqlite3.Error as e:
+                logger.error(f"주문 원장 저장 실패: {e}")
+                return
+
+            self.writes += 1
+            if self.writes % self.PRUNE_EVERY == 0:
+                self.prune()
+
+    def prune(self):
+        """보관 기간이 지난 기록을 삭제합니다."""
+        with self.lock:
+            try:
+                conn = self._connect()
+                conn.execute(
+                    "DELETE FROM order_ledger WHERE updated_at < ?",
+                    (time.time() - self.retention_days * 86400,)
+                )
+                conn.commit()
+            except sqlite3.Error as e:
+                logger.error(f"주문 원장 정리 실패: {e}")
+
+order_ledger = OrderLedger(order_ledger_path, order_ledger_retention_days)
+
+
+def _normalize_link(url) -> str:
+    """캐시 키 및 배치 결과 매칭을 위한 링크 정규화"""
+    if not url:
+        return ''
+    return str(url).strip().rstrip('/')
+
+def _chunks(values: list, size: int):
+    for i in range(0, len(values), size):
+        yield values[i:i + size]
+
+
 class SocialMediaValidator:
     def __init__(self, apify_token: str, actor_id: str):
         self.client = ApifyClientAsync(apify_token)
         self.actor_id = actor_id
 
+    def _cache_key(self, kind: str, key: str, actor_id: Optional[str] = None) -> tuple:
+        return (actor_id or self.actor_id, kind, key)
+
+    async def _cached(self, kind: str, key: str, fetch, ttl_kind: Optional[str] = None, actor_id: Optional[str] = None):
+        """검증 결과 캐시를 거쳐 fetch()를 실행합니다."""
+        return await validation_cache.get_or_fetch(self._cache_key(kind, key, actor_id), ttl_kind or kind, fetch)
+
+    async def _run_actor_batch(self, kind: str, keys: list, build_input, match_key, evaluate,
+                               actor_id: Optional[str] = None, ttl_kind: Optional[str] = None) -> dict:
+        """
+        같은 종류의 입력을 한 번의 액터 실행으로 검증하고 결과를 입력별로 나눕니다.
+        :param keys: list, 정규화된 입력 (중복 및 캐시에 있는 입력 제외 후 apify_batch_size 단위로 실행)
+        :param build_input: 입력 리스트를 받아 run_input을 만드는 함수
+        :param match_key: 데이터셋 아이템에서 원래 입력 키를 찾는 함수
+        :param evaluate: 입력별 아이템 리스트를 단건 검증과 같은 형식의 결과로 바꾸는 함수
+        :return: dict, {입력: 결과} (매칭되지 않은 입력은 포함하지 않음)
+        """
+        results = {}
+        pending = []
+        for key in dict.fromkeys(key for key in keys if key):
+            cached = validation_cache.get(self._cache_key(kind, key, actor_id), ttl_kind or kind)
+            if cached is not None:
+                results[key] = cached
+            else:
+                pending.append(key)
+        if not pending:
+            return results
+        keys = pending
+
+        # 배치가 끝날 때까지 같은 입력의 단건 검증은 배치 결과를 기다림
+        reserved = {key: validation_cache.reserve(self._cache_key(kind, key, actor_id)) for key in keys}
+        try:
+            return await self._run_reserved_batch(kind, keys, build_input, match_key, evaluate, actor_id, results)
+        finally:
+            for key, future in reserved.items():
+                if future is not None:
+                    validation_cache.release(self._cache_key(kind, key, actor_id), future, results.get(key, MISSING))
+
+    async def _run_reserved_batch(self, kind, keys, build_input, match_key, evaluate, actor_id, results):
+        async def run_chunk(chunk):
+            try:
+                return chunk, await self._run_actor(build_input(chunk), actor_id=actor_id)
+            except Exception as e:
+                logger.exception(f"배치 검증 오류 ({kind}, {len(chunk)}건): {e}")
+                return chunk, []
+
+        for chunk, items in await asyncio.gather(*(run_chunk(chunk) for chunk in _chunks(keys, apify_batch_size))):
+            grouped = {key: [] for key in chunk}
+            for item in items:
+                key = match_key(item, chunk)
+                if key in grouped:
+                    grouped[key].append(item)
+            for key, key_items in grouped.items():
+                # 결과가 매칭되지 않은 입력은 단건 검증으로 넘깁니다
+                if key_items:
+                    results[key] = evaluate(key_items)
+                    validation_cache.set(self._cache_key(kind, key, actor_id), results[key])
+        logger.info(f"배치 검증 완료 ({kind}): 실행 {len(keys)}건, 결과 {len(results)}건")
+        return results
+
+    async def _run_actor(self, run_input: dict, actor_id: Optional[str] = None) -> list:
+        """액터를 실행하고 데이터셋 아이템을 반환합니다. 액터별 동시 실행 수를 제한합니다."""
+        actor_id = actor_id or self.actor_id
+        async with get_actor_semaphore(actor_id):
+            with span(actor_id, 'apify'):
+                run = await self.client.actor(actor_id).call(run_input=run_input)
+                dataset_items = await self.client.dataset(run['defaultDatasetId']).list_items()
+        return dataset_items.items
+
     async def validate_profile(self, profile_input: str):
         raise NotImplementedError("Each platform must implement validate_profile")
 
@@ -128,7 +622,7 @@ class YoutubeValidator(SocialMediaValidator):
             if 'youtube.com/shorts/' in url:
                 return url.split('shorts/')[1].split('?')[0]
         except Exception as e:
-            print(f"Shorts ID extraction error: {e}")
+            logger.error(f"Shorts ID extraction error: {e}")
         return None
 
     def _is_valid_base_url(self, url: str) -> bool:
@@ -180,7 +674,7 @@ class YoutubeValidator(SocialMediaValidator):
                 if match:
                     return match.group(1)
         except Exception as e:
-            print(f"Channel ID extraction error: {e}")
+            logger.error(f"Channel ID extraction error: {e}")
         return None
 
     def _extract_video_id(self, url: str) -> Optional[str]:
@@ -191,89 +685,106 @@ class YoutubeValidator(SocialMediaValidator):
             elif 'youtu.be/' in url:
                 return url.split('youtu.be/')[1].split('?')[0]
         except Exception as e:
-            print(f"Video ID extraction error: {e}")
+            logger.error(f"Video ID extraction error: {e}")
         return None
 
+    def _evaluate_items(self, items: list):
+        if 'note' in items[0]:
+            return [False, items]
+        return [len(items) > 0 and not items[0].get('error'), items]
+
+    def _match_input_url(self, item: dict, keys: list) -> Optional[str]:
+        """데이터셋 아이템을 요청한 startUrl과 매칭"""
+        for field in ('input', 'fromYTUrl', 'inputUrl', 'url'):
+            value = _normalize_link(item.get(field))
+            for key in keys:
+                if value and value == _normalize_link(key):
+                    return key
+        return None
+
+    def _channel_input(self, channel_urls: list) -> dict:
+        return {
+            "startUrls": [{"url": url} for url in channel_urls],
+            "maxResults": 10,
+            "maxResultsShorts": 0,
+            "maxResultStreams": 0,
+        }
+
+    def _video_input(self, video_urls: list) -> dict:
+        return {
+            "searchQueries": [],
+            "maxResults": 10,
+            "maxResultsShorts": 0,
+            "maxResultStreams": 0,
+            "startUrls": [{"url": url} for url in video_urls],
+            "subtitlesLanguage": "any",
+            "subtitlesFormat": "srt",
+        }
+
+    def _shorts_input(self, shorts_urls: list) -> dict:
+        return {
+            "searchQueries": [],
+            "maxResults": 1,
+            "maxResultsShorts": 1,
+            "maxResultStreams": 0,
+            "startUrls": [{"url": url} for url in shorts_urls],
+        }
+
+    async def validate_channels(self, channel_urls: list) -> dict:
+        """여러 채널을 한 번의 액터 실행으로 검증합니다."""
+        channel_urls = [_normalize_link(url) for url in channel_urls if self._extract_channel_id(url)]
+        return await self._run_actor_batch('channel', channel_urls, self._channel_input, self._match_input_url, self._evaluate_items)
+
+    async def validate_videos(self, video_urls: list) -> dict:
+        """여러 동영상을 한 번의 액터 실행으로 검증합니다."""
+        video_urls = [_normalize_link(url) for url in video_urls]
+        return await self._run_actor_batch('video', video_urls, self._video_input, self._match_input_url, self._evaluate_items)
+
+    async def validate_shorts_list(self, shorts_urls: list) -> dict:
+        """여러 쇼츠를 한 번의 액터 실행으로 검증합니다."""
+        shorts_urls = [_normalize_link(url) for url in shorts_urls]
+        return await self._run_actor_batch('shorts', shorts_urls, self._shorts_input, self._match_input_url, self._evaluate_items)
+
     async def validate_channel(self, channel_url: str):
-        print('channel_url0', channel_url)
+        logger.debug(f"channel_url0 {channel_url}")
         try:
             channel_id = self._extract_channel_id(channel_url)
             if not channel_id:
                 return [False, []]
 
-            run = await self.client.actor(self.actor_id).call(
-                run_input={
-                    "startUrls": [{"url": channel_url}],
-                    "maxResults": 10,
-                    "maxResultsShorts": 0,
-                    "maxResultStreams": 0,
-                }
-            )
-            
-            dataset_items = await self.client.dataset(run['defaultDatasetId']).list_items()
-            # print(dataset_items)
-            items = dataset_items.items
-            if 'note' in items[0]:
-                return [False, items]
-            return [len(items) > 0 and not items[0].get('error'), items]
+            async def fetch():
+                items = await self._run_actor(self._channel_input([channel_url]))
+                return self._evaluate_items(items)
+
+            return await self._cached('channel', _normalize_link(channel_url), fetch)
             
         except Exception as e:
-            print(f"Channel validation error: {str(e)}")
-            traceback.print_exc()
+            logger.exception(f"Channel validation error: {str(e)}")
             return [False, []]
 
     async def validate_video(self, video_url: str):
         try:
-            run = await self.client.actor(self.actor_id).call(
-                run_input={
-                    "searchQueries": [],
-                    "maxResults": 10,
-                    "maxResultsShorts": 0,
-                    "maxResultStreams": 0,
-                    "startUrls": [
-                        {"url": video_url},
-                    ],
-                    "subtitlesLanguage": "any",
-                    "subtitlesFormat": "srt",
-                }
-            )
-            
-            dataset_items = await self.client.dataset(run['defaultDatasetId']).list_items()
-            # print(dataset_items)
-            items = dataset_items.items
-            if 'note' in items[0]:
-                return [False, items]
-            return [len(items) > 0 and not items[0].get('error'), items]
+            async def fetch():
+                items = await self._run_actor(self._video_input([video_url]))
+                return self._evaluate_items(items)
+
+            return await self._cached('video', _normalize_link(video_url), fetch)
             
         except Exception as e:
-            print(f"Video validation error: {str(e)}")
-            traceback.print_exc()
+            logger.exception(f"Video validation error: {str(e)}")
             return [False, []]
         
     async def validate_shorts(self, shorts_url: str):
         """Shorts URL의 유효성을 검증합니다."""
         try:
-            run = await self.client.actor(self.actor_id).call(
-                run_input={
-                    "searchQueries": [],
-                    "maxResults": 1,
-                    "maxResultsShorts": 1,
-                    "maxResultStreams": 0,
-                    "startUrls": [
-                        {"url": shorts_url},
-                    ],
-                }
-            )
-            
-            dataset_items = await self.client.dataset(run['defaultDatasetId']).list_items()
-            items = dataset_items.items
-            if 'note' in items[0]:
-                return [False, items]
-            return [len(items) > 0 and not items[0].get('error'), items]
+            async def fetch():
+                items = await self._run_actor(self._shorts_input([shorts_url]))
+                return self._evaluate_items(items)
+
+            return await self._cached('shorts', _normalize_link(shorts_url), fetch)
             
         except Exception as e:
-            print(f"Shorts validation error: {str(e)}")
-            traceback.print_exc()
+            logger.exception(f"Shorts validation error: {str(e)}")
             return [False, []]
 
 # Tiktok Validator
@@ -295,47 +806,71 @@ class TiktokValidator(SocialMediaValidator):
             if '@' in url:
                 return url.split('@')[1].split('/')[0].split('?')[0]
         except Exception as e:
-            print(f"Username extraction error: {e}")
+            logger.error(f"Username extraction error: {e}")
         return None
 
+    def _match_item(self, item: dict, keys: list) -> Optional[str]:
+        for field in ('input', 'inputUrl', 'webVideoUrl', 'url'):
+            value = _normalize_link(item.get(field))
+            for key in keys:
+                if value and (value == _normalize_link(key) or value.endswith(f"@{key}")):
+                    return key
+        author = (item.get('authorMeta') or {}).get('name')
+        return author if author in keys else None
+
+    def _evaluate_items(self, items: list) -> bool:
+        return len(items) > 0 and not items[0].get('error')
+
+    async def validate_profiles(self, profile_urls: list) -> dict:
+        """여러 프로필을 한 번의 액터 실행으로 검증합니다. {아이디: 유효 여부}"""
+        usernames = [self._extract_username(url) for url in profile_urls]
+        return await self._run_actor_batch(
+            'profile', usernames,
+            lambda chunk: {"profiles": chunk, "resultsLimit": 1},
+            self._match_item, self._evaluate_items
+        )
+
+    async def validate_posts(self, video_urls: list) -> dict:
+        """여러 동영상을 한 번의 액터 실행으로 검증합니다. {링크: 유효 여부}"""
+        video_urls = [_normalize_link(url) for url in video_urls]
+        return await self._run_actor_batch(
+            'post', video_urls,
+            lambda chunk: {"videoUrls": chunk, "resultsLimit": 1},
+            self._match_item, self._evaluate_items
+        )
+
     async def validate_profile(self, profile_url: str) -> bool:
         try:
             username = self._extract_username(profile_url)
             if not username:
                 return False
 
-            run = await self.client.actor(self.actor_id).call(
-                run_input={
+            async def fetch():
+                items = await self._run_actor({
                     "profiles": [username],
                     "resultsLimit": 1
-                }
-            )
-            
-            dataset_items = await self.client.dataset(run['defaultDatasetId']).list_items()
-            items = dataset_items.items
-            return len(items) > 0 and not items[0].get('error')
+                })
+                return self._evaluate_items(items)
+
+            return await self._cached('profile', username, fetch)
             
         except Exception as e:
-            print(f"Profile validation error: {str(e)}")
-            traceback.print_exc()
+            logger.exception(f"Profile validation error: {str(e)}")
             return False
 
     async def validate_post(self, video_url: str) -> bool:
         try:
-            run = await self.client.actor(self.actor_id).call(
-                run_input={
+            async def fetch():
+                items = await self._run_actor({
                     "videoUrls": [video_url],
                     "resultsLimit": 1
-                }
-            )
-            
-            dataset_items = await self.client.dataset(run['defaultDatasetId']).list_items()
-            items = dataset_items.items
-            return len(items) > 0 and not items[0].get('error')
+                })
+                return self._evaluate_items(items)
+
+            return await self._cached('post', _normalize_link(video_url), fetch)
             
         except Exception as e:
-            print(f"Video validation error: {str(e)}")
-            traceback.print_exc()
+            logger.exception(f"Video validation error: {str(e)}")
             return False
 
 # Twitter Validator
@@ -357,47 +892,71 @@ class TwitterValidator(SocialMediaValidator):
             username = url.split('twitter.com/')[1].split('/')[0]
             return username
         except Exception as e:
-            print(f"Username extraction error: {e}")
+            logger.error(f"Username extraction error: {e}")
         return None
 
+    def _match_item(self, item: dict, keys: list) -> Optional[str]:
+        for field in ('input', 'inputUrl', 'url', 'twitterUrl'):
+            value = _normalize_link(item.get(field))
+            for key in keys:
+                if value and value == _normalize_link(key):
+                    return key
+        author = (item.get('author') or {}).get('userName') or item.get('username')
+        return author if author in keys else None
+
+    def _evaluate_items(self, items: list) -> bool:
+        return len(items) > 0 and not items[0].get('error')
+
+    async def validate_profiles(self, profile_urls: list) -> dict:
+        """여러 프로필을 한 번의 액터 실행으로 검증합니다. {아이디: 유효 여부}"""
+        usernames = [self._extract_username(url) for url in profile_urls]
+        return await self._run_actor_batch(
+            'profile', usernames,
+            lambda chunk: {"usernames": chunk, "resultsLimit": 1},
+            self._match_item, self._evaluate_items
+        )
+
+    async def validate_posts(self, tweet_urls: list) -> dict:
+        """여러 트윗을 한 번의 액터 실행으로 검증합니다. {링크: 유효 여부}"""
+        tweet_urls = [_normalize_link(url) for url in tweet_urls]
+        return await self._run_actor_batch(
+            'post', tweet_urls,
+            lambda chunk: {"tweetUrls": chunk, "resultsLimit": 1},
+            self._match_item, self._evaluate_items
+        )
+
     async def validate_profile(self, profile_url: str) -> bool:
         try:
             username = self._extract_username(profile_url)
             if not username:
                 return False
 
-            run = await self.client.actor(self.actor_id).call(
-                run_input={
+            async def fetch():
+                items = await self._run_actor({
                     "usernames": [username],
                     "resultsLimit": 1
-                }
-            )
-            
-            dataset_items = await self.client.dataset(run['defaultDatasetId']).list_items()
-            items = dataset_items.items
-            return len(items) > 0 and not items[0].get('error')
+                })
+                return self._evaluate_items(items)
+
+            return await self._cached('profile', username, fetch)
             
         except Exception as e:
-            print(f"Profile validation error: {str(e)}")
-            traceback.print_exc()
+            logger.exception(f"Profile validation error: {str(e)}")
             return False
 
     async def validate_post(self, tweet_url: str) -> bool:
         try:
-            run = await self.client.actor(self.actor_id).call(
-                run_input={
+            async def fetch():
+                items = await self._run_actor({
                     "tweetUrls": [tweet_url],
                     "resultsLimit": 1
-                }
-            )
-            
-            dataset_items = await self.client.dataset(run['defaultDatasetId']).list_items()
-            items = dataset_items.items
-            return len(items) > 0 and not items[0].get('error')
+                })
+                return self._evaluate_items(items)
+
+            return await self._cached('post', _normalize_link(tweet_url), fetch)
             
         except Exception as e:
-            print(f"Tweet validation error: {str(e)}")
-            traceback.print_exc()
+            logger.exception(f"Tweet validation error: {str(e)}")
             return False
 
 # Instagram Validator
@@ -431,103 +990,168 @@ class InstagramValidator(SocialMediaValidator):
             else:
                 return username
         except Exception as e:
-            print(f"Username extraction error: {e}")
+            logger.error(f"Username extraction error: {e}")
             return None
 
-    async def validate_profile(self, profile_input: str):
+    def _match_profile(self, item: dict, keys: list) -> Optional[str]:
+        """프로필 데이터셋 아이템을 요청한 아이디와 매칭"""
+        candidates = [item.get('username'), self._extract_username(_normalize_link(item.get('inputUrl')))]
+        for candidate in candidates:
+            for key in keys:
+                if candidate and str(candidate).lower() == key.lower():
+                    return key
+        return None
+
+    def _match_post(self, item: dict, keys: list) -> Optional[str]:
+        """게시물 데이터셋 아이템을 요청한 링크와 매칭"""
+        value = _normalize_link(item.get('inputUrl'))
+        for key in keys:
+            if value and value == _normalize_link(key):
+                return key
+        return None
+
+    def _profile_input(self, usernames: list) -> dict:
+        return {
+            "usernames": usernames,
+            "resultsLimit": 1
+        }
+
+    def _post_input(self, post_urls: list) -> dict:
+        return {
+            "directUrls": post_urls,
+            "resultsType": "posts",
+            "resultsLimit": 1,
+            "addParentData": False
+        }
+
+    def _evaluate_profile(self, items: list):
+        return [len(items) > 0 and not items[0].get('error'), items]
+
+    def _evaluate_post(self, items: list):
+        # 게시물이 존재하고 error가 없는 경우 True
+        return [len(items) > 0 and not any(item.get('error') for item in items), items]
+
+    def _profile_key(self, profile_input: str) -> Optional[str]:
+        username = self._extract_username(profile_input)
+        return username.strip().lower() if username else None
+
+    async def validate_profiles(self, profile_inputs: list, latest: bool = False) -> dict:
+        """
+        여러 프로필을 한 번의 액터 실행으로 검증합니다. {아이디: [유효 여부, 아이템]}
+        :param latest: bool, 최신 게시물 조회 용도면 True (짧은 캐시 유효기간 적용)
+        """
+        usernames = [self._profile_key(profile_input) for profile_input in profile_inputs]
+        return await self._run_actor_batch(
+            'profile', usernames, self._profile_input, self._match_profile, self._evaluate_profile,
+            ttl_kind='latest_post' if latest else 'profile'
+        )
+
+    async def validate_posts(self, post_urls: list) -> dict:
+        """여러 게시물을 한 번의 액터 실행으로 검증합니다. {링크: [유효 여부, 아이템]}"""
+        post_urls = [_normalize_link(url) for url in post_urls]
+        return await self._run_actor_batch('post', post_urls, self._post_input, self._match_post, self._evaluate_post, actor_id=actor_insta_post)
+
+    async def validate_profile(self, profile_input: str, latest: bool = False):
         try:
-            username = self._extract_username(profile_input)
+            username = self._profile_key(profile_input)
             if not username:
                 return False
+
+            async def fetch():
+                logger.debug(f"Validating profile for username: {username}")
                 
-            print(f"Validating profile for username: {username}")
-            
-            # Actor 실행 및 완료 대기
-            run = await self.client.actor(self.actor_id).call(
-                run_input={
-                    "usernames": [username],
-                    "resultsLimit": 1
-                }
-            )
-            
-            # 데이터셋에서 결과 가져오기
-            dataset_items = await self.client.dataset(run['defaultDatasetId']).list_items()
-            items = dataset_items.items
-            print()
-            print('validate_profile 결과')
-            print(items[0].get("inputUrl"))
-            print()
-            return [len(items) > 0 and not items[0].get('error'), items]
+                # Actor 실행 및 완료 대기
+                items = await self._run_actor(self._profile_input([username]))
+                logger.debug(f"validate_profile 결과: {items[0].get('inputUrl')}")
+                return self._evaluate_profile(items)
+
+            return await self._cached('profile', username, fetch, ttl_kind='latest_post' if latest else 'profile')
             
         except Exception as e:
-            print(f"Profile validation error: {str(e)}")
-            traceback.print_exc()
+            logger.exception(f"Profile validation error: {str(e)}")
             return [False, '']
 
     async def validate_post(self, post_url: str):
+        items = []
         try:
-            print(f"Validating post URL: {post_url}")
-
-            run = await self.client.actor(actor_insta_post).call(
-                run_input={
-                    "directUrls": [post_url],
-                    "resultsType": "posts",
-                    "resultsLimit": 1,
-                    "addParentData": False
-                }
-            )
+            async def fetch():
+                logger.debug(f"Validating post URL: {post_url}")
 
-            # 데이터셋에서 결과 가져오기
-            dataset_items = await self.client.dataset(run["defaultDatasetId"]).list_items()
-            items = dataset_items.items
-            print(f"Post validation result: {items[0].get('inputUrl')}")
-        
-            # 게시물이 존재하고 error가 없는 경우 True
-            is_valid = len(items) > 0 and not any(item.get('error') for item in items)
-            print(f"Post exists: {is_valid}")
+                items = await self._run_actor(self._post_input([post_url]), actor_id=actor_insta_post)
+                logger.debug(f"Post validation result: {items[0].get('inputUrl')}")
+                return self._evaluate_post(items)
+
+            is_valid, items = await self._cached('post', _normalize_link(post_url), fetch, actor_id=actor_insta_post)
+            logger.debug(f"Post exists: {is_valid}")
             return [is_valid, items]
                 
         except Exception as e:
-            print(f"Post validation error: {str(e)}")
-            traceback.print_exc()
+            logger.exception(f"Post validation error: {str(e)}")
             return [False, items]
                 
         except ApifyApiError as e:
-            print(f"Apify API error: {str(e)}")
-            traceback.print_exc()
+            logger.exception(f"Apify API error: {str(e)}")
             return [False, items]
 
     async def get_recent_posts(self, username: str):
         try:
                         
             # Actor 실행 및 완료 대기
-            run = await self.client.actor(self.actor_id).call(
-                run_input={
-                    "usernames": [username],
-                    "resultsLimit": 1
-                }
-            )
-            
-            # 데이터셋에서 결과 가져오기
-            dataset_items = await self.client.dataset(run['defaultDatasetId']).list_items()
-            items = dataset_items.items
-            print()
-            print('get_recent_post 결과')
-            print(len(items[0].get('latestPosts')))
-            print()
+            items = await self._run_actor(self._profile_input([username]))
+            logger.debug(f"get_recent_post 결과: {len(items[0].get('latestPosts'))}건")
             return [len(items) > 0 and not items[0].get('error'), items[0].get('latestPosts')]
             
         except Exception as e:
-            print(f"Recent posts fetch error: {str(e)}")
+            logger.error(f"Recent posts fetch error: {str(e)}")
             return [False, '']
 
-class StoreAPI:
-    def __init__(self, api_key):
+def _is_permanent_store_error(e) -> bool:
+    """4xx 응답은 재시도해도 같으므로 바로 포기"""
+    response = getattr(e, 'response', None)
+    return response is not None and response.status_code < 500
+
+
+class AsyncStoreAPI:
+    """
+    스토어 API 클라이언트 (httpx, 연결 풀 공유)
+    클라이언트는 처음 호출한 이벤트 루프에서 만들고, 루프가 바뀌면 새로 만듭니다.
+    """
+    def __init__(self, api_key, pool_size: int = store_pool_size):
         self.api_key = api_key
         self.base_url = store_basic_url
+        self.pool_size = pool_size
+        self._client = None
+        self._loop = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._loop is not loop:
+            self._client = httpx.AsyncClient(
+                limits=httpx.Limits(max_connections=self.pool_size, max_keepalive_connections=self.pool_size),
+                timeout=httpx.Timeout(store_read_timeout, connect=store_connect_timeout),
+                # 연결 단계 오류만 재시도 (요청이 전달되지 않았으므로 주문 생성도 안전)
+                transport=httpx.AsyncHTTPTransport(retries=2),
+            )
+            self._loop = loop
+        return self._client
+
+    async def _post(self, params):
+        with span(params.get('action'), 'store'):
+            response = await self._get_client().post(self.base_url, data=params)
+            response.raise_for_status()  # HTTP 오류 체크
+            return response.json()
 
-    def create_order(self, service_id, link, quantity, runs=None, interval=None):
+    # 조회 요청은 5xx/연결 오류/타임아웃 시 재시도
+    @backoff.on_exception(
+        backoff.expo,
+        (httpx.TransportError, httpx.HTTPStatusError),
+        max_tries=store_max_tries,
+        giveup=_is_permanent_store_error
+    )
+    async def _post_with_retry(self, params):
+        return await self._post(params)
 
+    async def create_order(self, service_id, link, quantity):
         params = {
             'key': self.api_key,
             'action': 'add',
@@ -537,39 +1161,13 @@ class StoreAPI:
         }
 
         try:
-            response = requests.post(self.base_url, data=params)
-            response.raise_for_status()  # HTTP 오류 체크
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            print(f"주문 생성 중 오류 발생: {e}")
-            raise
-    
-    # 주문 상태 확인
-    def get_order_status(self, order_id):
-
-        params = {
-            'key': self.api_key,
-            'action': 'status',
-            'order': order_id
-        }
-
-        try:
-            response = requests.post(self.base_url, data=params)
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            print(f"주문 상태 확인 중 오류 발생: {e}")
+            # 주문 생성은 중복 주문이 생길 수 있어 응답 단계 오류는 재시도하지 않음
+            return await self._post(params)
+        except httpx.HTTPError as e:
+            logger.error(f"주문 생성 중 오류 발생: {e}")
             raise
 
-    # 여러 주문의 상태를 한 번에 확인
-    def get_multiple_order_status(self, order_ids):
-        """ 
-        Args:
-            order_ids (list): 주문 ID 리스트
-            
-        Returns:
-            dict: 여러 주문의 상태 정보
-        """
+    async def get_multiple_order_status(self, order_ids):
         params = {
             'key': self.api_key,
             'action': 'status',
@@ -577,28 +1175,44 @@ class StoreAPI:
         }
 
         try:
-            response = requests.post(self.base_url, data=params)
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            print(f"다중 주문 상태 확인 중 오류 발생: {e}")
+            return await self._post_with_retry(params)
+        except httpx.HTTPError as e:
+            logger.error(f"다중 주문 상태 확인 중 오류 발생: {e}")
             raise
 
-    # 계정 잔액을 확인
-    def get_balance(self):
+    async def get_balance(self):
         params = {
             'key': self.api_key,
             'action': 'balance'
         }
 
         try:
-            response = requests.post(self.base_url, data=params)
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            print(f"잔액 확인 중 오류 발생: {e}")
+            return await self._post_with_retry(params)
+        except httpx.HTTPError as e:
+            logger.error(f"잔액 확인 중 오류 발생: {e}")
             raise
 
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            self._loop = None
+
+
+# 주기마다 새로 만들지 않고 연결 풀을 공유
+async_store_api = AsyncStoreAPI(store_api_key)
+
+
+# 저장된 검증 결과 조회
+def get_stored_outcome(kind: str, key: str):
+    stored = validation_store.get(kind, key)
+    if stored is not None:
+        logger.debug(f"저장된 검증 결과를 사용합니다 ({kind}): {key}, 유효: {stored['is_valid']}")
+    return stored
+
+def is_stored(kind: str, key: str) -> bool:
+    return validation_store.get(kind, key) is not None
+
 
 # 릴스 링크 유효성 검사
 async def validate_instagram_reels(order, profile_validator, post_validator):
@@ -607,28 +1221,45 @@ async def validate_instagram_reels(order, profile_validator, post_validator):
     is_link = post_validator._is_post_link(url)
 
     if is_link:
+        store_key = _normalize_link(url)
+        stored = get_stored_outcome('instagram_reels', store_key)
+        if stored is not None:
+            order['validate_url'] = 1 if stored['is_valid'] else 0
+            return order
+
         is_valid_post = await post_validator.validate_post(url)
         is_valid = is_valid_post[0]
         if is_valid:
             if is_valid_post[1][0].get('type') == 'Video':
                 order['validate_url'] = 1
             else:
-                print(f"유효하지 않은 릴스입니다: {url}")
+                logger.info(f"유효하지 않은 릴스입니다: {url}")
                 order['validate_url'] = 0
         else:
-            print(f"유효하지 않은 게시물입니다: {url}")
+            logger.info(f"유효하지 않은 게시물입니다: {url}")
             order['validate_url'] = 0
+        if is_valid_post[1]:
+            validation_store.put('instagram_reels', store_key, order['validate_url'] == 1)
     else:
         if is_cardlink:
-            print(f"아이디 또는 프로필카드링크 입니다: {url}")
+            logger.info(f"아이디 또는 프로필카드링크 입니다: {url}")
             url = profile_validator._extract_username(url)
         else:
-            print(f"아이디 또는 프로필링크 입니다: {url}")
-        is_valid_profile = await profile_validator.validate_profile(url)
+            logger.info(f"아이디 또는 프로필링크 입니다: {url}")
+
+        store_key = profile_validator._profile_key(url)
+        stored = get_stored_outcome('instagram_latest_reels', store_key)
+        if stored is not None:
+            if stored['is_valid']:
+                order['order_edit_link'] = stored['edit_link']
+                order['validate_url'] = 1
+            else:
+                order['validate_url'] = 0
+            return order
+
+        is_valid_profile = await profile_validator.validate_profile(url, latest=True)
         if is_valid_profile[0]:
-            print('릴스 프로필 결과')
-            print(is_valid_profile[1])
-            print('')
+            logger.debug("릴스 프로필 결과: %s", summarize(is_valid_profile[1]))
             latest_video_post = max(
                 (post for post in is_valid_profile[1][0]['latestPosts'] if post['type'] == 'Video'), 
                 key=lambda x: x['timestamp']
@@ -636,50 +1267,63 @@ async def validate_instagram_reels(order, profile_validator, post_validator):
             if latest_video_post:
                 order['order_edit_link'] = latest_video_post['url']
                 order['validate_url'] = 1
+                validation_store.put('instagram_latest_reels', store_key, True, edit_link=latest_video_post['url'])
             else:
-                print(f"릴스 게시물이 없습니다.: {url}")
+                logger.info(f"릴스 게시물이 없습니다.: {url}")
                 order['validate_url'] = 0
         else:
-            print(f"유효하지 않은 아이디입니다.: {url}")
+            logger.info(f"유효하지 않은 아이디입니다.: {url}")
             order['validate_url'] = 0
+            if is_valid_profile[1]:
+                validation_store.put('instagram_latest_reels', store_key, False)
     return order
 
 
 async def validate_instagram_profile(order, profile_validator):
     url = order['order_link']
-    print('프로필카드 여부', profile_validator._is_profile_card_link(url), url)
+    logger.debug(f"프로필카드 여부 {profile_validator._is_profile_card_link(url)} {url}")
     if profile_validator._is_profile_card_link(url):
         edit_url = profile_validator._extract_username(url)
-        print(f"프로필카드링크 {url} 주문으로 다음으로 변경합니다 -> {edit_url}")
+        logger.info(f"프로필카드링크 {url} 주문으로 다음으로 변경합니다 -> {edit_url}")
         order['order_edit_link'] = edit_url
 
     if profile_validator._is_tag_username(url):
         edit_url = profile_validator._extract_username(url)
         edit_url = edit_url.replace('@', '')
-        print(f"@ 링크 {url} 주문으로 다음으로 변경합니다 -> {edit_url}")
+        logger.info(f"@ 링크 {url} 주문으로 다음으로 변경합니다 -> {edit_url}")
         order['order_edit_link'] = edit_url
 
     if profile_validator._is_post_link(url):
-        print(f"팔로워 주문에 링크 주문을 접수: {url}")
+        logger.info(f"팔로워 주문에 링크 주문을 접수: {url}")
         order['validate_url'] = 0
         return order
 
     username = profile_validator._extract_username(url)   
 
     if not username:
-        print(f"유효하지 않은 프로필링크 또는 아이디 형식입니다: {url}")
+        logger.info(f"유효하지 않은 프로필링크 또는 아이디 형식입니다: {url}")
         order['validate_url'] = 0
         return order
 
-    valid_result = await profile_validator.validate_profile(username)
+    store_key = profile_validator._profile_key(username)
+    stored = get_stored_outcome('instagram_profile', store_key)
+    if stored is not None:
+        is_valid, is_private = stored['is_valid'], stored['is_private']
+    else:
+        valid_result = await profile_validator.validate_profile(username)
+        is_valid = bool(valid_result[0])
+        is_private = bool(is_valid and valid_result[1][0]["private"])
+        # 액터가 결과를 돌려준 경우만 저장 (실행 오류는 저장하지 않음)
+        if valid_result[1]:
+            validation_store.put('instagram_profile', store_key, is_valid, is_private=is_private)
 
-    if not valid_result[0]:
-        print(f"존재하지 않는 프로필입니다: {username}")
+    if not is_valid:
+        logger.info(f"존재하지 않는 프로필입니다: {username}")
         order['validate_url'] = 0
         return order
     
-    if valid_result[1][0]["private"]:
-        print(f"비공개 프로필입니다: {username}")
+    if is_private:
+        logger.info(f"비공개 프로필입니다: {username}")
         order['validate_url'] = 0
         return order
     
@@ -693,42 +1337,70 @@ async def validate_instagram_post(order, profile_validator, post_validator):
     is_link = post_validator._is_post_link(url)
 
     if is_link:
+        store_key = _normalize_link(url)
+        stored = get_stored_outcome('instagram_post', store_key)
+        if stored is not None:
+            order['validate_url'] = 1 if stored['is_valid'] else 0
+            return order
+
         is_valid_post = await post_validator.validate_post(url)
         is_valid = is_valid_post[0]
         if is_valid:
             order['validate_url'] = 1
         else:
-            print(f"유효하지 않은 게시물입니다: {url}")
+            logger.info(f"유효하지 않은 게시물입니다: {url}")
             order['validate_url'] = 0
+        if is_valid_post[1]:
+            validation_store.put('instagram_post', store_key, bool(is_valid))
     else:
         if is_cardlink:
-            print(f"아이디 또는 프로필카드링크 입니다: {url}")
+            logger.info(f"아이디 또는 프로필카드링크 입니다: {url}")
             url = profile_validator._extract_username(url)
         else:
-            print(f"아이디 또는 프로필링크 입니다: {url}")
-        is_valid_profile = await profile_validator.validate_profile(url)
+            logger.info(f"아이디 또는 프로필링크 입니다: {url}")
+
+        store_key = profile_validator._profile_key(url)
+        stored = get_stored_outcome('instagram_latest_post', store_key)
+        if stored is not None:
+            if stored['is_valid']:
+                order['order_edit_link'] = stored['edit_link']
+                order['validate_url'] = 1
+            else:
+                order['validate_url'] = 0
+            return order
+
+        is_valid_profile = await profile_validator.validate_profile(url, latest=True)
         if is_valid_profile[0]:
-            print('게시물 프로필 결과')
             valid_url = is_valid_profile[1][0].get("inputUrl")
             valid_followers = is_valid_profile[1][0].get("followersCount")
-            print(f"링크:{valid_url}, 팔로워 수:{valid_followers}")
-            print('')            
+            logger.debug(f"게시물 프로필 결과 - 링크:{valid_url}, 팔로워 수:{valid_followers}")
             latest_post = max(is_valid_profile[1][0]['latestPosts'], key=lambda x: x['timestamp'])
             
             order['order_edit_link'] = latest_post['url']
             order['validate_url'] = 1
+            validation_store.put('instagram_latest_post', store_key, True, edit_link=latest_post['url'])
         else:
-            print(f"게시물이 존재하지 않습니다.: {url}")
+            logger.info(f"게시물이 존재하지 않습니다.: {url}")
             order['validate_url'] = 0
+            if is_valid_profile[1]:
+                validation_store.put('instagram_latest_post', store_key, False)
     return order
 
 
 # 유튜브 검증 보조 함수
 async def validate_youtube_channel(order, channel_validator, video_validator):
     url = order['order_link']
+    store_key = _normalize_link(url)
+    stored = get_stored_outcome('youtube_channel', store_key)
+    if stored is not None:
+        if stored['edit_link']:
+            order['order_edit_link'] = stored['edit_link']
+        order['validate_url'] = 1 if stored['is_valid'] else 0
+        return order
+
     if not channel_validator._is_channel_link(url):
         if not channel_validator._is_video_link(url):
-            print(f"유효하지 않은 링크입니다: {url}")
+            logger.info(f"유효하지 않은 링크입니다: {url}")
             order['validate_url'] = 0
             return order
         else:
@@ -743,13 +1415,16 @@ async def validate_youtube_channel(order, channel_validator, video_validator):
     is_valid = await channel_validator.validate_channel(url)
 
     if not is_valid[0]:
-        print(f"결과: {is_valid[1]}")
-        print(f"유효하지 않은 채널입니다: {url}")
+        logger.debug("결과: %s", summarize(is_valid[1]))
+        logger.info(f"유효하지 않은 채널입니다: {url}")
         order['validate_url'] = 0
     else:
-        print(f"결과: {is_valid[1]}")
-        print(f"유효한 채널입니다: {url}")
+        logger.debug("결과: %s", summarize(is_valid[1]))
+        logger.info(f"유효한 채널입니다: {url}")
         order['validate_url'] = 1
+    if is_valid[1]:
+        edit_link = order['order_edit_link'] if order['order_edit_link'] != -1 else None
+        validation_store.put('youtube_channel', store_key, order['validate_url'] == 1, edit_link=edit_link)
     return order
 
 async def validate_youtube_video(order, channel_validator, video_validator):
@@ -758,6 +1433,15 @@ async def validate_youtube_video(order, channel_validator, video_validator):
     if not video_validator._is_valid_base_url(url):
         order['validate_url'] = 0
         return order
+
+    store_key = _normalize_link(url)
+    stored = get_stored_outcome('youtube_video', store_key)
+    if stored is not None:
+        if stored['edit_link']:
+            order['order_edit_link'] = stored['edit_link']
+        order['validate_url'] = 1 if stored['is_valid'] else 0
+        return order
+
     if not video_validator._is_video_link(url):
         if not video_validator._is_channel_link(url):
             order['validate_url'] = 0
@@ -771,13 +1455,16 @@ async def validate_youtube_video(order, channel_validator, video_validator):
     is_valid = await video_validator.validate_video(url)
     
     if not is_valid[0]:
-        print(f"결과: {is_valid[1]}")
-        print(f"유효하지 않은 동영상입니다: {url}")
+        logger.debug("결과: %s", summarize(is_valid[1]))
+        logger.info(f"유효하지 않은 동영상입니다: {url}")
         order['validate_url'] = 0
     else:
-        print(is_valid[1])
-        print(f"유효한 동영상입니다: {url}")
+        logger.debug("결과: %s", summarize(is_valid[1]))
+        logger.info(f"유효한 동영상입니다: {url}")
         order['validate_url'] = 1
+    if is_valid[1]:
+        edit_link = order['order_edit_link'] if order['order_edit_link'] != -1 else None
+        validation_store.put('youtube_video', store_key, order['validate_url'] == 1, edit_link=edit_link)
     return order
 
 async def validate_youtube_comment(order, channel_validator, video_validator):
@@ -791,16 +1478,24 @@ async def validate_youtube_comment(order, channel_validator, video_validator):
             order['validate_url'] = 0
             return order
 
+    store_key = _normalize_link(url)
+    stored = get_stored_outcome('youtube_video', store_key)
+    if stored is not None:
+        order['validate_url'] = 1 if stored['is_valid'] else 0
+        return order
+
     is_valid = await video_validator.validate_video(url)
 
     if not is_valid[0]:
         # print(f"결과: {is_valid[1]}")
-        print(f"유효하지 않은 동영상입니다: {url}")
+        logger.info(f"유효하지 않은 동영상입니다: {url}")
         order['validate_url'] = 0
     else:
         # print(is_valid[1])
-        print(f"유효한 동영상입니다: {url}")
+        logger.info(f"유효한 동영상입니다: {url}")
         order['validate_url'] = 1
+    if is_valid[1]:
+        validation_store.put('youtube_video', store_key, order['validate_url'] == 1)
     return order
 
 async def validate_youtube_shorts(order, channel_validator, video_validator):
@@ -809,17 +1504,25 @@ async def validate_youtube_shorts(order, channel_validator, video_validator):
     if not video_validator._is_shorts_link(url):
         order['validate_url'] = 0
         return order
+
+    store_key = _normalize_link(url)
+    stored = get_stored_outcome('youtube_shorts', store_key)
+    if stored is not None:
+        order['validate_url'] = 1 if stored['is_valid'] else 0
+        return order
     
     is_valid = await video_validator.validate_shorts(url)
 
     if not is_valid[0]:
         # print(f"결과: {is_valid[1]}")
-        print(f"유효하지 않은 동영상입니다: {url}")
+        logger.info(f"유효하지 않은 동영상입니다: {url}")
         order['validate_url'] = 0
     else:
         # print(is_valid[1])
-        print(f"유효한 동영상입니다: {url}")
+        logger.info(f"유효한 동영상입니다: {url}")
         order['validate_url'] = 1
+    if is_valid[1]:
+        validation_store.put('youtube_shorts', store_key, order['validate_url'] == 1)
     return order
 
 async def validate_youtube_community(order, channel_validator, video_validator):
@@ -827,12 +1530,12 @@ async def validate_youtube_community(order, channel_validator, video_validator):
     url = order['order_link']
 
     if not video_validator._is_community_link(url):
-        print(f"커뮤니티 게시물 형식이 아닙니다: {url}")
+        logger.info(f"커뮤니티 게시물 형식이 아닙니다: {url}")
         order['validate_url'] = 0
         return order
     
     # URL 형식이 맞으면 주문 진행
-    print(f"유효한 커뮤니티 게시물 형식입니다: {url}")
+    logger.info(f"유효한 커뮤니티 게시물 형식입니다: {url}")
     order['validate_url'] = 1
     return order
 
@@ -843,7 +1546,7 @@ async def validate_tiktok_profile(order, validator):
     is_valid = await validator.validate_profile(url)
     order['validate_url'] = 1 if is_valid else 0
     if not is_valid:
-        print(f"유효하지 않은 프로필입니다: {url}")
+        logger.info(f"유효하지 않은 프로필입니다: {url}")
 
 async def process_tiktok_video(order, validator):
     url = order['order_link']
@@ -851,7 +1554,7 @@ async def process_tiktok_video(order, validator):
         is_valid = await validator.validate_post(url)
         order['validate_url'] = 1 if is_valid else 0
         if not is_valid:
-            print(f"유효하지 않은 동영상입니다: {url}")
+            logger.info(f"유효하지 않은 동영상입니다: {url}")
     else:
         await process_tiktok_profile_for_videos(order, validator)
 
@@ -859,18 +1562,18 @@ async def process_tiktok_profile_for_videos(order, validator):
     url = order['order_link']
     username = validator._extract_username(url)
     if not username:
-        print(f"유효하지 않은 프로필 URL입니다: {url}")
+        logger.info(f"유효하지 않은 프로필 URL입니다: {url}")
         order['validate_url'] = 0
         return
     
     if not await validator.validate_profile(username):
-        print(f"유효하지 않은 프로필입니다: {url}")
+        logger.info(f"유효하지 않은 프로필입니다: {url}")
         order['validate_url'] = 0
         return
     
     recent_videos = await validator.get_recent_videos(username)
     if not recent_videos:
-        print(f"최근 동영상이 없습니다: {username}")
+        logger.info(f"최근 동영상이 없습니다: {username}")
         order['validate_url'] = 0
         return
     
@@ -883,7 +1586,7 @@ async def validate_twitter_profile(order, validator):
     is_valid = await validator.validate_profile(url)
     order['validate_url'] = 1 if is_valid else 0
     if not is_valid:
-        print(f"유효하지 않은 프로필입니다: {url}")
+        logger.info(f"유효하지 않은 프로필입니다: {url}")
 
 async def process_twitter_tweet(order, validator):
     url = order['order_link']
@@ -891,7 +1594,7 @@ async def process_twitter_tweet(order, validator):
         is_valid = await validator.validate_post(url)
         order['validate_url'] = 1 if is_valid else 0
         if not is_valid:
-            print(f"유효하지 않은 트윗입니다: {url}")
+            logger.info(f"유효하지 않은 트윗입니다: {url}")
     else:
         await process_twitter_profile_for_tweets(order, validator)
 
@@ -899,18 +1602,18 @@ async def process_twitter_profile_for_tweets(order, validator):
     url = order['order_link']
     username = validator._extract_username(url)
     if not username:
-        print(f"유효하지 않은 프로필 URL입니다: {url}")
+        logger.info(f"유효하지 않은 프로필 URL입니다: {url}")
         order['validate_url'] = 0
         return
     
     if not await validator.validate_profile(username):
-        print(f"유효하지 않은 프로필입니다: {url}")
+        logger.info(f"유효하지 않은 프로필입니다: {url}")
         order['validate_url'] = 0
         return
     
     recent_tweets = await validator.get_recent_tweets(username)
     if not recent_tweets:
-        print(f"최근 트윗이 없습니다: {username}")
+        logger.info(f"최근 트윗이 없습니다: {username}")
         order['validate_url'] = 0
         return
     
@@ -923,10 +1626,20 @@ async def process_twitter_profile_for_tweets(order, validator):
 #     print(f"JSON 키 파일이 존재하지 않습니다: {json_key_path}")
 
 class GoogleSheetManager:
+    """
+    구글 시트 연결 관리
+    처음 사용할 때 인증하고, 워크시트 객체는 이름별로 캐시해 두었다가 실패했을 때만 다시 조회합니다.
+    """
     def __init__(self):
         self.gc = None
         self.doc = None
-        self.initialize_connection()
+        self.worksheets = {}
+
+    def connect(self):
+        """연결되어 있지 않으면 인증 후 스프레드시트를 엽니다."""
+        if self.doc is None:
+            self.initialize_connection()
+        return self.doc
 
     @backoff.on_exception(
         backoff.expo,
@@ -935,7 +1648,7 @@ class GoogleSheetManager:
     )
     def initialize_connection(self):
         try:
-            print("JSON 문자열 확인:")
+            logger.debug("JSON 문자열 확인:")
             # print(f"Length: {len(json_str)}")
             # print(f"First part: {json_str[:100]}...")
             # print(f"Contains private_key: {'private_key' in json_str}")
@@ -949,7 +1662,7 @@ class GoogleSheetManager:
                 pk = pk.replace('\\n', '\n')
                 credentials_info['private_key'] = pk
             
-            print("JSON 파싱 성공")
+            logger.debug("JSON 파싱 성공")
             # print("private_key 시작 부분:", credentials_info.get('private_key', ''))
             # print(1)
             credentials = service_account.Credentials.from_service_account_info(
@@ -959,19 +1672,34 @@ class GoogleSheetManager:
             # print(2)
             self.gc = gspread.authorize(credentials)
             # print(3)
-            self.doc = self.gc.open_by_key(sheet_key)
+            with span('open_by_key', 'sheets'):
+                self.doc = self.gc.open_by_key(sheet_key)
+            self.worksheets = {}
             # print(4)
         except Exception as e:
-            print(f"연결 초기화 실패: {e}")
+            logger.error(f"연결 초기화 실패: {e}")
             raise
 
     def get_worksheet(self, sheet_name):
+        worksheet = self.worksheets.get(sheet_name)
+        if worksheet is not None:
+            return worksheet
+
+        doc = self.connect()
         try:
-            return self.doc.worksheet(sheet_name)
+            with span('worksheet', 'sheets'):
+                worksheet = doc.worksheet(sheet_name)
         except Exception as e:
-            print(f"get_worksheet 실패: {e}")
+            logger.error(f"get_worksheet 실패: {e}")
             self.initialize_connection()  # 연결 재시도
-            return self.doc.worksheet(sheet_name)
+            with span('worksheet', 'sheets'):
+                worksheet = self.doc.worksheet(sheet_name)
+        self.worksheets[sheet_name] = worksheet
+        return worksheet
+
+    def invalidate_worksheet(self, sheet_name):
+        """캐시한 워크시트 객체를 버려 다음 사용 시 다시 조회하도록 합니다."""
+        self.worksheets.pop(sheet_name, None)
 
     @backoff.on_exception(
         backoff.expo,
@@ -981,87 +1709,281 @@ class GoogleSheetManager:
     def get_sheet_data(self, sheet_name):
         worksheet = self.get_worksheet(sheet_name)
         try:
-            header = worksheet.row_values(1)
-            data = worksheet.get_all_records()
+            with span('get_all_records', 'sheets'):
+                data = worksheet.get_all_records()
 
             if not data:
-                df = pd.DataFrame(columns=header)
+                # 데이터가 없을 때만 헤더를 따로 읽음
+                with span('row_values', 'sheets'):
+                    df = pd.DataFrame(columns=worksheet.row_values(1))
             else:
                 df = pd.DataFrame(data)
             
             return df
         except Exception as e:
-            print(f"시트 데이터 가져오기 실패: {e}")
+            logger.error(f"시트 데이터 가져오기 실패: {e}")
+            self.invalidate_worksheet(sheet_name)
             raise
 
-sheet_manager = GoogleSheetManager()
+    def get_revision(self, sheet_name, cell):
+        """시트의 리비전 셀 값을 반환합니다. 조회할 수 없으면 None을 반환합니다."""
+        try:
+            worksheet = self.get_worksheet(sheet_name)
+            with span('acell', 'sheets'):
+                return worksheet.acell(cell).value
+        except Exception as e:
+            logger.error(f"{sheet_name} 리비전 셀 조회 실패: {e}")
+            self.invalidate_worksheet(sheet_name)
+            return None
 
-service_sheets = sheet_manager.get_worksheet('market_service_list')
-order_sheets = sheet_manager.get_worksheet('market_store_order_list')
-manual_order_sheets = sheet_manager.get_worksheet('manual_order_list')
+class BufferedSheetWriter:
+    """
+    주기 동안 시트에 추가할 행을 모아 두었다가 append_rows로 한 번에 기록합니다.
+    worksheet.append_row와 같은 방식으로 사용할 수 있습니다.
+    기록에 실패한 행은 버퍼에 남아 다음 flush에서 다시 기록됩니다.
+    on_written(rows)는 시트에 실제로 기록된 행으로만 호출됩니다.
+    """
+    def __init__(self, sheet_manager, sheet_name, chunk_size=100, on_written=None):
+        self.sheet_manager = sheet_manager
+        self.sheet_name = sheet_name
+        self.chunk_size = max(1, chunk_size)
+        self.on_written = on_written
+        self.rows = []
 
-service_sheet = sheet_manager.get_sheet_data('market_service_list')
+    def append_row(self, row_data):
+        self.rows.append(list(row_data))
 
+    def __len__(self):
+        return len(self.rows)
 
-def get_service_number(df, service_name: str, detail_option: str):
-    """
-    주어진 서비스 이름과 세부 선택에 일치하는 서비스 번호를 반환합니다.
-    :param df: DataFrame, 구글 시트에서 불러온 데이터
-    :param service_name: str, 서비스 이름
-    :param detail_option: str, 세부 선택 (비어 있을 수 있음)
-    :return: str, 일치하는 서비스 번호 (없을 경우 None 반환)
-    """
+    def pending_keys(self, column=0):
+        """아직 기록하지 못한(이전 flush 실패 포함) 행의 column 값 집합"""
+        return {row[column] for row in self.rows if len(row) > column}
 
-    filtered_row = df[
-        (df['서비스유무'] == 1) &  # 서비스 유무가 1인 경우만
-        (df['서비스이름'] == service_name) &  # 서비스 이름이 일치
-        (df['세부선택'] == detail_option)  # 세부 선택이 일치
-    ]
+    @backoff.on_exception(
+        backoff.expo,
+        (gspread.exceptions.APIError, TransportError, requests.exceptions.RequestException),
+        max_tries=5
+    )
+    def _append_chunk(self, chunk):
+        worksheet = self.sheet_manager.get_worksheet(self.sheet_name)
+        try:
+            with span('append_rows', 'sheets'):
+                worksheet.append_rows(chunk)
+        except Exception:
+            self.sheet_manager.invalidate_worksheet(self.sheet_name)
+            raise
 
-    # 결과 반환
-    if not filtered_row.empty:
-        result = filtered_row.iloc[0]['서비스번호']  # 첫 번째 일치하는 값 반환
-        # print(f"반환할 서비스 번호: {result}, 타입: {type(result)}")
-        return result
-    return -1  # 일치하는 값이 없으면 None 반환
+    def flush(self):
+        """모아 둔 행을 chunk_size 단위로 기록하고 기록한 행 수를 반환합니다."""
+        if not self.rows:
+            return 0
+
+        written = 0
+        while self.rows:
+            chunk = self.rows[:self.chunk_size]
+            self._append_chunk(chunk)
+            # 기록에 성공한 행만 버퍼에서 제거
+            del self.rows[:len(chunk)]
+            written += len(chunk)
+            if self.on_written is not None:
+                try:
+                    self.on_written(chunk)
+                except Exception as e:
+                    logger.exception(f"{self.sheet_name} 기록 후 처리 실패: {e}")
 
-def add_order_sheet(df, order):
-    print()
-    try:
-        row_data = [
-            str(order.get('market_order_num', '')),
-            str(order.get('store_order_num', '').get('order')),
-            str(order.get('order_username', '')),
-            str(order.get('service_num', '')),
-            str(order.get('order_link', '')),
-            str(order.get('order_edit_link', '')),
-            str(order.get('quantity', '')),
-            str(order.get('service_name', '')),
-            str(order.get('order_time', '')),
-            "배송중",
-        ]
-        df.append_row(row_data)
-        print(f"주문 정보가 시트에 추가되었습니다: {row_data}")
-        return order
+        logger.info(f"{self.sheet_name} 시트에 {written}행 기록 완료")
+        return written
 
-    
-    except Exception as e:
-        print(f"시트 추가 중 오류 발생: {str(e)}")
-        traceback.print_exc()
 
-# 1. Selenium WebDriver 설정
-def init_driver():
-    chrome_options = Options()
-    chrome_options.add_argument('--no-sandbox')
-    chrome_options.add_argument('--headless')
-    chrome_options.add_argument('--disable-dev-shm-usage')
-    chrome_options.add_argument('--disable-gpu')
-    chrome_options.add_argument('--user-data-dir=/home/chrome/chrome-data')
-    chrome_options.add_argument('--remote-debugging-port=9222') 
+class ManualOrderIndex:
+    """
+    manual_order_list 시트의 마켓주문번호 -> 행 번호 색인
+    - 처음(그리고 reseed_interval마다) 시트 전체를 한 번 읽어 색인을 만듭니다.
+    - 그 사이에는 마지막으로 알고 있는 행 다음부터(꼬리 범위)만 읽어 추가된 행을 반영합니다.
+    - 처리상태는 사람이 수정할 수 있으므로 알림 직전에 해당 행의 처리상태 셀만 다시 읽습니다.
+    """
+    ORDER_NUM_COLUMN = '마켓주문번호'
+    STATUS_COLUMN = '처리상태'
+
+    def __init__(self, sheet_manager, sheet_name, reseed_interval=3600):
+        self.sheet_manager = sheet_manager
+        self.sheet_name = sheet_name
+        self.reseed_interval = reseed_interval
+        self.rows = {}  # 마켓주문번호 -> [행 번호]
+        self.statuses = {}  # 행 번호 -> 처리상태
+        self.row_count = 0  # 헤더 포함 마지막으로 읽은 행 수
+        self.column_count = 0
+        self.order_num_col = None
+        self.status_col = None
+        self.seeded_at = None
+
+    def _add_rows(self, values, first_row):
+        for offset, row in enumerate(values):
+            row_number = first_row + offset
+            order_num = row[self.order_num_col] if len(row) > self.order_num_col else ''
+            status = row[self.status_col] if len(row) > self.status_col else ''
+            if order_num:
+                self.rows.setdefault(order_num, []).append(row_number)
+            self.statuses[row_number] = status
+
+    def _seed(self, worksheet):
+        with span('get_all_values', 'sheets'):
+            values = worksheet.get_all_values()
+        header = values[0] if values else []
+        if self.ORDER_NUM_COLUMN not in header or self.STATUS_COLUMN not in header:
+            raise ValueError(f"{self.sheet_name} 시트 헤더에 {self.ORDER_NUM_COLUMN}/{self.STATUS_COLUMN} 열이 없습니다.")
+
+        self.rows = {}
+        self.statuses = {}
+        self.order_num_col = header.index(self.ORDER_NUM_COLUMN)
+        self.status_col = header.index(self.STATUS_COLUMN)
+        self.column_count = len(header)
+        self._add_rows(values[1:], 2)
+        self.row_count = len(values)
+        self.seeded_at = time.monotonic()
+        logger.info(f"수동주문 색인 적재: {len(self.rows)}건 ({self.row_count}행)")
+
+    def _fetch_tail(self, worksheet):
+        first_row = self.row_count + 1
+        last_col = gspread.utils.rowcol_to_a1(1, self.column_count).rstrip('0123456789')
+        try:
+            with span('get', 'sheets'):
+                values = worksheet.get(f"A{first_row}:{last_col}")
+        except gspread.exceptions.APIError as e:
+            # 시트 격자 끝까지 채워져 있으면 다음 행 범위 자체가 없음
+            if 'exceeds grid limits' in str(e):
+                return
+            raise
+        if not values:
+            return
+        self._add_rows(values, first_row)
+        self.row_count += len(values)
+        logger.info(f"수동주문 색인 추가: {len(values)}행")
+
+    @backoff.on_exception(
+        backoff.expo,
+        (gspread.exceptions.APIError, TransportError, requests.exceptions.RequestException),
+        max_tries=5
+    )
+    def refresh(self):
+        """색인을 최신 상태로 맞춥니다. (필요할 때만 전체, 평소에는 추가된 행만 읽음)"""
+        worksheet = self.sheet_manager.get_worksheet(self.sheet_name)
+        try:
+            if self.seeded_at is None or time.monotonic() - self.seeded_at >= self.reseed_interval:
+                self._seed(worksheet)
+            else:
+                self._fetch_tail(worksheet)
+        except Exception:
+            self.sheet_manager.invalidate_worksheet(self.sheet_name)
+            raise
+
+    def __contains__(self, order_num):
+        return order_num in self.rows
+
+    @backoff.on_exception(
+        backoff.expo,
+        (gspread.exceptions.APIError, TransportError, requests.exceptions.RequestException),
+        max_tries=5
+    )
+    def pending_order_nums(self, order_nums, status='처리필요'):
+        """주어진 주문 중 처리상태가 status인 행이 있는 마켓주문번호 집합을 반환합니다."""
+        row_numbers = sorted({
+            row_number
+            for order_num in order_nums
+            for row_number in self.rows.get(order_num, [])
+        })
+        if row_numbers:
+            # 해당 행의 처리상태 셀만 한 번에 다시 읽음
+            status_col = gspread.utils.rowcol_to_a1(1, self.status_col + 1).rstrip('0123456789')
+            worksheet = self.sheet_manager.get_worksheet(self.sheet_name)
+            try:
+                with span('batch_get', 'sheets'):
+                    ranges = worksheet.batch_get([f"{status_col}{row_number}" for row_number in row_numbers])
+            except Exception:
+                self.sheet_manager.invalidate_worksheet(self.sheet_name)
+                raise
+            for row_number, value_range in zip(row_numbers, ranges):
+                self.statuses[row_number] = value_range[0][0] if value_range and value_range[0] else ''
+
+        return {
+            order_num
+            for order_num in order_nums
+            if any(self.statuses.get(row_number) == status for row_number in self.rows.get(order_num, []))
+        }
+
+
+# 처음 시트를 사용할 때 인증 (import 시점에는 연결하지 않음)
+sheet_manager = GoogleSheetManager()
+
+# 주문 시트에 실제로 기록된 행만 원장에 RECORDED로 표시 (어느 flush에서 기록되든 동일)
+order_sheet_writer = BufferedSheetWriter(
+    sheet_manager, 'market_store_order_list', sheet_write_chunk_size,
+    on_written=lambda rows: order_ledger.mark_state([row[0] for row in rows], OrderLedger.RECORDED, (OrderLedger.PLACED,))
+)
+manual_order_sheet_writer = BufferedSheetWriter(sheet_manager, 'manual_order_list', sheet_write_chunk_size)
+manual_order_index = ManualOrderIndex(sheet_manager, 'manual_order_list', manual_index_reseed_interval)
+
+
+def flush_sheet_writers():
+    """버퍼에 남은 시트 행을 모두 기록합니다. 실패한 행은 다음 호출까지 버퍼에 남습니다."""
+    for writer in (order_sheet_writer, manual_order_sheet_writer):
+        try:
+            writer.flush()
+        except Exception as e:
+            logger.exception(f"{writer.sheet_name} 시트 기록 실패 ({len(writer)}행 대기): {e}")
+
+
+# 프로세스 종료 시에도 남은 행 기록
+atexit.register(flush_sheet_writers)
+
+# 서비스 목록은 주기마다 catalog_manager.refresh()로 필요할 때만 다시 불러옴
+catalog_manager = ServiceCatalogManager(
+    load=lambda: ServiceCatalog.from_dataframe(sheet_manager.get_sheet_data('market_service_list')),
+    get_revision=(lambda: sheet_manager.get_revision('market_service_list', catalog_revision_cell)) if catalog_revision_cell else None,
+    refresh_interval=catalog_refresh_interval
+)
+
+
+def add_order_sheet(df, order):
+    try:
+        row_data = [
+            str(order.get('market_order_num', '')),
+            str(order.get('store_order_num', '').get('order')),
+            str(order.get('order_username', '')),
+            str(order.get('service_num', '')),
+            str(order.get('order_link', '')),
+            str(order.get('order_edit_link', '')),
+            str(order.get('quantity', '')),
+            str(order.get('service_name', '')),
+            str(order.get('order_time', '')),
+            "배송중",
+            "",  # 남은수량 (주문 상태 동기화에서 기록)
+            "",  # 차감금액 (주문 상태 동기화에서 기록)
+        ]
+        df.append_row(row_data)
+        logger.info(f"주문 정보가 시트에 추가되었습니다: {row_data}")
+        return order
+
+    
+    except Exception as e:
+        logger.exception(f"시트 추가 중 오류 발생: {str(e)}")
+
+# 1. Selenium WebDriver 설정
+@span('init_driver')
+def init_driver():
+    chrome_options = Options()
+    chrome_options.add_argument('--no-sandbox')
+    chrome_options.add_argument('--headless')
+    chrome_options.add_argument('--disable-dev-shm-usage')
+    chrome_options.add_argument('--disable-gpu')
+    chrome_options.add_argument('--user-data-dir=/home/chrome/chrome-data')
+    chrome_options.add_argument('--remote-debugging-port=9222') 
     driver = webdriver.Chrome(options=chrome_options)
     return driver
 
 # 2. Cafe24 로그인
+@span('cafe24_login')
 def cafe24_login(driver, login_page, wait):
     driver.get(login_page)
     try:
@@ -1078,30 +2000,217 @@ def cafe24_login(driver, login_page, wait):
             driver.execute_script("arguments[0].click();", pw_change_btn)
             wait.until(EC.url_to_be(dashboard_page))
         except Exception as e:
-            print(f"클릭 중 오류 발생: {e}")
+            logger.error(f"클릭 중 오류 발생: {e}")
     except TimeoutException:
-        print("10초 동안 버튼이 클릭 가능한 상태가 되지 않았습니다.")
+        logger.warning("10초 동안 버튼이 클릭 가능한 상태가 되지 않았습니다.")
     return driver
 
-def get_od_info(order):
-    # print('order', order)
-    order_options = order.split('\n')
-    if len(order_options) > 1:
-        order_service = order_options[0].split(' : ')[1].strip()
-        order_url = order_options[1].split(' : ')[1].strip()
-        return [order_url, order_service]
-    else:
-        order_url = order_options[0].split(' : ')[1].strip()
-        return [order_url, '']
+# CDP Network.setCookies가 받는 쿠키 필드
+COOKIE_PARAM_FIELDS = ('name', 'value', 'domain', 'path', 'secure', 'httpOnly', 'sameSite', 'expires', 'priority', 'sourceScheme', 'sourcePort')
 
+def save_session_cookies(driver, path=cafe24_cookie_path):
+    """로그인된 세션의 쿠키(모든 도메인)를 파일로 저장합니다."""
+    try:
+        cookies = driver.execute_cdp_cmd('Network.getAllCookies', {}).get('cookies', [])
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump({'saved_at': time.time(), 'cookies': cookies}, f)
+        os.replace(tmp_path, path)
+        logger.info(f"세션 쿠키 저장 완료: {len(cookies)}개")
+    except Exception as e:
+        logger.error(f"세션 쿠키 저장 실패: {e}")
 
-# 3. 배송준비중 주문 정보 크롤링
-def scrape_orders(driver, order_page, wait):
-    driver.get(order_page)
+def restore_session_cookies(driver, path=cafe24_cookie_path) -> bool:
+    """저장된 쿠키를 브라우저에 넣습니다. 만료된 쿠키는 제외합니다."""
+    if not os.path.exists(path):
+        return False
+    try:
+        with open(path, encoding='utf-8') as f:
+            saved = json.load(f)
+        now = time.time()
+        cookies = [
+            {field: cookie[field] for field in COOKIE_PARAM_FIELDS if field in cookie}
+            for cookie in saved.get('cookies', [])
+            if cookie.get('session') or cookie.get('expires', -1) <= 0 or cookie['expires'] > now
+        ]
+        if not cookies:
+            return False
+        driver.execute_cdp_cmd('Network.setCookies', {'cookies': cookies})
+        logger.info(f"세션 쿠키 복원: {len(cookies)}개")
+        return True
+    except Exception as e:
+        logger.error(f"세션 쿠키 복원 실패: {e}")
+        return False
+
+
+class DriverManager:
+    """
+    스케줄러 주기 사이에 로그인된 브라우저 세션을 유지합니다.
+    - 새 브라우저는 저장된 세션 쿠키로 먼저 시도하고, 로그인 페이지로 이동되면 그때만 다시 로그인합니다.
+    - max_cycles 주기를 채우거나 JS 힙 사용량이 max_heap_mb를 넘으면 브라우저를 새로 띄웁니다.
+    - 주기가 실패하면 다음 주기에는 새 브라우저로 시작합니다.
+    """
+    def __init__(self, max_cycles: int, max_heap_mb: int, timeout: int = 20):
+        self.max_cycles = max_cycles
+        self.max_heap_mb = max_heap_mb
+        self.timeout = timeout
+        self.driver = None
+        self.wait = None
+        self.cycles = 0
+
+    def _is_alive(self) -> bool:
+        try:
+            self.driver.current_url
+            return True
+        except WebDriverException:
+            return False
+
+    def _heap_mb(self) -> float:
+        try:
+            used = self.driver.execute_script("return performance.memory ? performance.memory.usedJSHeapSize : 0")
+            return (used or 0) / 1024 / 1024
+        except WebDriverException:
+            return 0
+
+    def _recycle_reason(self) -> Optional[str]:
+        if self.driver is None:
+            return '브라우저 없음'
+        if not self._is_alive():
+            return '세션 끊김'
+        if self.cycles >= self.max_cycles:
+            return f'{self.cycles}회 사용'
+        heap_mb = self._heap_mb()
+        if heap_mb > self.max_heap_mb:
+            return f'JS 힙 {heap_mb:.0f}MB'
+        return None
+
+    def _is_login_page(self) -> bool:
+        current_url = self.driver.current_url.split('?')[0]
+        if login_page and current_url.startswith(login_page.split('?')[0]):
+            return True
+        return len(self.driver.find_elements(By.NAME, "loginPasswd")) > 0
+
+    def start(self):
+        self.quit()
+        self.driver = init_driver()
+        self.wait = WebDriverWait(self.driver, timeout=self.timeout)
+        self.cycles = 0
+        restore_session_cookies(self.driver)
+
+    def ensure_logged_in(self):
+        """주문 페이지로 이동해 로그인 상태를 확인하고, 로그인 페이지로 이동되면 다시 로그인합니다."""
+        self.driver.get(order_page)
+        if not self._is_login_page():
+            logger.info('기존 로그인 세션 사용')
+            return
+
+        logger.info('로그인 세션 없음, 다시 로그인합니다.')
+        cafe24_login(self.driver, login_page, self.wait)
+        self.driver.get(order_page)
+        if self._is_login_page():
+            raise RuntimeError('Cafe24 로그인 실패: 로그인 후에도 로그인 페이지로 이동됩니다.')
+        save_session_cookies(self.driver)
+
+    def acquire(self):
+        """이번 주기에 사용할 (driver, wait)을 반환합니다. 주문 페이지를 방금 불러온 상태로 반환합니다."""
+        reason = self._recycle_reason()
+        if reason:
+            logger.info(f"브라우저 시작 ({reason})")
+            self.start()
+        self.ensure_logged_in()
+        self.cycles += 1
+        return self.driver, self.wait
+
+    def release(self, success: bool):
+        """주기 종료. 성공하면 갱신된 쿠키를 저장하고, 실패한 주기의 브라우저는 상태를 알 수 없으므로 종료합니다."""
+        if success:
+            save_session_cookies(self.driver)
+        else:
+            self.quit()
+
+    def quit(self):
+        if self.driver is not None:
+            try:
+                self.driver.quit()
+            except Exception as e:
+                logger.error(f"브라우저 종료 중 오류 발생: {e}")
+        self.driver = None
+        self.wait = None
+
+driver_manager = DriverManager(driver_max_cycles, driver_max_heap_mb)
+
+
+# 주문 테이블 전체를 한 번의 execute_script 호출로 읽어오는 스크립트
+# tbody 단위로 공통 정보(주문자/주문일시/주문번호)와 행(tr)별 정보를 반환합니다.
+# 반환 형식은 order_parser.parse_order_table과 같습니다.
+ORDER_TABLE_SCRIPT = """
+const text = (root, selector) => {
+    const el = root.querySelector(selector);
+    return el ? el.innerText.trim() : null;
+};
+return Array.from(document.querySelectorAll('#shipedReadyList tbody')).map((tbody) => ({
+    username: text(tbody, '.w80'),
+    order_time: text(tbody, '.w65'),
+    order_num: text(tbody, '.w120.orderNum'),
+    rows: Array.from(tbody.querySelectorAll('tr')).map((tr) => {
+        const option = tr.querySelector('.w220.left');
+        if (!option) {
+            return null;
+        }
+        const p = option.querySelector('p');
+        const links = p ? p.querySelectorAll('a') : [];
+        return {
+            service_text: links.length > 1 ? links[1].innerText.trim() : null,
+            detail: text(option, '.etc'),
+            username: text(tr, '.w80'),
+            order_time: text(tr, '.w65'),
+            order_num: text(tr, '.w120.orderNum'),
+            quantity: text(tr, '.w30.right'),
+            has_checkbox: tr.querySelector('.chkbox') !== null,
+        };
+    }),
+}));
+"""
+
+# 주문 행 위치로 체크박스를 찾는 스크립트
+ORDER_CHECKBOX_SCRIPT = """
+const tbody = document.querySelectorAll('#shipedReadyList tbody')[arguments[0]];
+const tr = tbody ? tbody.querySelectorAll('tr')[arguments[1]] : null;
+return tr ? tr.querySelector('.chkbox') : null;
+"""
+
+
+class OrderRowHandle:
+    """주문 행의 체크박스 위치. WebElement를 들고 있지 않고 클릭할 때만 찾습니다."""
+    def __init__(self, driver, tbody_index: int, row_index: int):
+        self.driver = driver
+        self.tbody_index = tbody_index
+        self.row_index = row_index
+
+    def find(self):
+        element = self.driver.execute_script(ORDER_CHECKBOX_SCRIPT, self.tbody_index, self.row_index)
+        if element is None:
+            raise NoSuchElementException(f"체크박스를 찾을 수 없습니다: {self}")
+        return element
+
+    def click(self):
+        self.find().click()
+
+    def is_selected(self):
+        return self.find().is_selected()
+
+    def __repr__(self):
+        return f"<OrderRowHandle tbody={self.tbody_index} row={self.row_index}>"
 
-    # 주문 정보 크롤링
-    orders = []
-    order_list = []
+
+# 3. 배송준비중 주문 정보 크롤링
+@span('scrape_orders')
+def scrape_orders(driver, order_page, wait, catalog, navigate=True):
+    # 로그인 확인에서 이미 주문 페이지를 불러왔으면 다시 불러오지 않음
+    if navigate or not driver.current_url.split('?')[0].startswith(order_page.split('?')[0]):
+        driver.get(order_page)
 
     try:
         result = wait.until(EC.any_of(
@@ -1119,271 +2228,810 @@ def scrape_orders(driver, order_page, wait):
             )
         ))
     except TimeoutException:
-        print("20초 동안 어떤 조건도 만족하지 않았습니다.")
+        logger.warning("20초 동안 어떤 조건도 만족하지 않았습니다.")
         return [[], '']
 
-    order_element = driver.find_element(By.CSS_SELECTOR, "#shipedReadyList")
     eship_element = driver.find_element(By.CSS_SELECTOR, "#eShipStartBtn")
-    orders = order_element.find_elements(By.TAG_NAME, "tbody")
     
     if not isinstance(result, list):
         return [[], eship_element]
 
-    for order in orders:
-        sub_orders = order.find_elements(By.TAG_NAME, "tr")
-
-        if len(sub_orders) == 1:
-            # print('한개')
-            print()
-            order = sub_orders[0]
-            try:
-                order_option = order.find_element(By.CSS_SELECTOR, ".w220.left")
-            except NoSuchElementException:
-                continue
-            try:
-                order_chk = order.find_element(By.CSS_SELECTOR, ".chkbox")
-            except NoSuchElementException:
-                print('no chkbox')
-
-            p = order_option.find_element(By.TAG_NAME, "p")
-            service_name = p.find_elements(By.TAG_NAME, "a")[1].text.split('(P')[0].strip()
-            order_detail = order_option.find_element(By.CSS_SELECTOR, ".etc")
-            order_username = order.find_element(By.CSS_SELECTOR, ".w80")
-            order_time = order.find_element(By.CSS_SELECTOR, ".w65")
-            order_num = order.find_element(By.CSS_SELECTOR, ".w120.orderNum")
-            order_cnt = order.find_element(By.CSS_SELECTOR, ".w30.right")
-            order_info = get_od_info(order_detail.text)
-            service = get_service_number(df=service_sheet, service_name=service_name, detail_option=order_info[1])
-
-            if service == 0 or service is None:
-                continue
-            else:
-                # print('serivce', service)
-                service_num = str(service)
-
-            order_list.append({
-                "market_order_num": order_num.text.split('\n')[0],
-                "order_username": order_username.textsplit('[')[0],
-                "service_num": str(service_num),
-                "quantity": order_cnt.text.replace(',', ''),
-                "order_link": order_info[0],
-                "order_edit_link": -1,
-                "order_time": order_time.text.replace('\\n', ', '),
-                "check_element": order_chk,
-                "service_name": service_name,
-                "store_order_num": {'order': -1},
-                "note": '',
-                "validate_url": -1
-            })
-        else:
-            for i, sub_order in enumerate(sub_orders):
-                try:
-                    order_option = sub_order.find_element(By.CSS_SELECTOR, ".w220.left")
-                except NoSuchElementException:
-                    continue
-                try:
-                    order_chk = sub_order.find_element(By.CSS_SELECTOR, ".chkbox")
-                except NoSuchElementException:
-                    print('no chkbox')
-
-                p = order_option.find_element(By.TAG_NAME, "p")
-                service_name = p.find_elements(By.TAG_NAME, "a")[1].text.split('(')[0].strip()
-                order_detail = order_option.find_element(By.CSS_SELECTOR, ".etc")
-                order_username = order.find_element(By.CSS_SELECTOR, ".w80")
-                order_time = order.find_element(By.CSS_SELECTOR, ".w65")
-                order_num_text = order.find_element(By.CSS_SELECTOR, ".w120.orderNum").text
-                order_num = order_num_text.split('\n')[0]
-                order_cnt = sub_order.find_element(By.CSS_SELECTOR, ".w30.right")
-                order_info = get_od_info(order_detail.text)
-
-                service = get_service_number(df=service_sheet, service_name=service_name, detail_option=order_info[1])
-                if service == 0 or service is None:
-                    continue
-                else:
-                    # print('serivce', service)
-                    service_num = service
-
-                order_list.append({
-                    "market_order_num": f"{order_num}-{i+1}",
-                    "order_username": order_username.text.split('[')[0],
-                    "service_num": str(service_num),
-                    "quantity": order_cnt.text.replace(',', ''),
-                    "order_link": order_info[0],
-                    "order_edit_link": -1,
-                    "order_time": order_time.text.replace('\\n', ', '),
-                    "check_element": order_chk,
-                    "service_name": service_name,
-                    "store_order_num": {'order': -1},
-                    "note": '',
-                    "validate_url": -1,
-                })
+    # 주문 테이블 전체를 한 번에 읽어와서 파이썬에서 파싱
+    if scrape_mode == 'html':
+        order_tables = parse_order_table(driver.page_source)
+    else:
+        order_tables = driver.execute_script(ORDER_TABLE_SCRIPT)
+    order_list = build_order_list(
+        order_tables,
+        catalog,
+        make_handle=lambda tbody_index, row_index: OrderRowHandle(driver, tbody_index, row_index)
+    )
 
-    print('주문 목록 작성 완료')
-    print('주문수량', len(orders))
-    print('스크랩 주문', order_list)
+    logger.info(f"주문 목록 작성 완료: 주문수량 {len(order_tables)}")
+    logger.debug("스크랩 주문 %s", summarize(order_list))
     return [order_list, eship_element]
 
 
-async def check_order_url(orders,
+async def validate_order(order,
+            catalog,
             instagram_profile_validator,
             instagram_post_validator,
             youtube_channel_validator,
             youtube_video_validator,
             tiktok_validator,
             twitter_validator):
+    """주문 하나의 링크를 검증합니다. 검증 중 오류가 나면 None을 반환합니다."""
+    url = None
+    try:
+        service_num = int(order['service_num'])
+        url = order['order_link']
+        
+        # 서비스 분류 조회
+        service_kind = catalog.get_kind(service_num)
+        if service_kind is None:
+            logger.warning(f"서비스 번호 {service_num}이 시트에 존재하지 않습니다.")
+            order['validate_url'] = 0
+            return order
+        
+        # 인스타그램 서비스 처리
+        if service_kind == 'instagram_follower':
+            # 팔로워 서비스 검증
+            order = await validate_instagram_profile(order, instagram_profile_validator)
+            logger.debug(f"팔로워 서비스 링크 검증결과 {order.get('inputUrl')}")
+        
+        elif service_kind == 'instagram_reels':
+            # 릴스 조회수 검증
+            order = await validate_instagram_reels(order, instagram_profile_validator, instagram_post_validator)
+            logger.debug(f"릴스 조회수 링크 검증 결과 {order.get('inputUrl')}")
+        
+        elif service_kind == 'instagram_custom_comment':
+            order['validate_url'] = 0
+            order['note'] = '커스텀 댓글 주문으로 수동 주문이 필요합니다.'
+        
+        elif service_kind == 'instagram_post':
+            order = await validate_instagram_post(order, instagram_profile_validator, instagram_post_validator)
+        
+        # 유튜브 서비스 처리
+        elif service_kind == 'youtube_subscriber':
+            # 구독자 서비스는 채널 검증
+            order = await validate_youtube_channel(order, youtube_channel_validator, youtube_video_validator)
+        elif service_kind == 'youtube_comment':
+            order = await validate_youtube_comment(order, youtube_channel_validator, youtube_video_validator)
+        elif service_kind == 'youtube_community':
+            # 커뮤니티 좋아요 서비스는 URL 형식만 검증
+            order = await validate_youtube_community(order, youtube_channel_validator, youtube_video_validator)
+        elif service_kind == 'youtube_shorts':
+            order = await validate_youtube_shorts(order, youtube_channel_validator, youtube_video_validator)
+        elif service_kind == 'youtube_video':
+            # 기타 유튜브 서비스는 동영상 검증
+            order = await validate_youtube_video(order, youtube_channel_validator, youtube_video_validator)
+        
+        # 틱톡 서비스 처리
+        elif service_kind == 'tiktok':
+            # tiktok_validator.validate_profile / validate_post 검증은 현재 사용하지 않음
+            order['validate_url'] = 0
+            order['note'] = '틱톡 서비스 주문입니다.'
+        
+        # 트위터 서비스 처리
+        elif service_kind == 'twitter':
+            # twitter_validator.validate_profile / validate_post 검증은 현재 사용하지 않음
+            order['validate_url'] = 0
+            order['note'] = '트위터 서비스 주문입니다.'
+        
+        # 기타 서비스
+        else:
+            order['validate_url'] = 0
 
-    manual_orders = []
-    processed_orders = []
+        return order
+    except Exception as e:
+        logger.exception(f"주문 처리 중 오류 발생: {url}, 에러: {e}")
+        order['validate_url'] = 0
+        return None
+
+
+async def prefetch_validations(orders,
+            catalog,
+            instagram_profile_validator,
+            instagram_post_validator,
+            youtube_channel_validator,
+            youtube_video_validator,
+            reserved: Optional[asyncio.Event] = None):
+    """
+    주문별 검증 전에 같은 종류의 입력을 모아 종류별로 한 번씩 액터를 실행합니다.
+    결과는 validation_cache에 저장되어 단건 검증에서 그대로 사용됩니다.
+    reserved를 넘기면 배치 입력 예약이 끝난 뒤 set 합니다. (예약 후에는 단건 검증을 동시에 시작해도 됨)
+    """
+    try:
+        await _prefetch_validations(
+            orders, catalog,
+            instagram_profile_validator, instagram_post_validator,
+            youtube_channel_validator, youtube_video_validator,
+            reserved
+        )
+    finally:
+        if reserved is not None:
+            reserved.set()
 
-    print('스크랩 주문', orders)
+
+async def _prefetch_validations(orders,
+            catalog,
+            instagram_profile_validator,
+            instagram_post_validator,
+            youtube_channel_validator,
+            youtube_video_validator,
+            reserved):
+    profiles, latest_profiles, posts, channels, videos, shorts = [], [], [], [], [], []
 
     for order in orders:
-        url = None
         try:
-            service_num = int(order['service_num'])
             url = order['order_link']
-            
-            # 서비스 이름 조회
-            filtered_row = service_sheet[service_sheet['서비스번호'] == service_num]
-            # print(filtered_row)
-            if filtered_row.empty:
-                print(f"서비스 번호 {service_num}이 시트에 존재하지 않습니다.")
-                order['validate_url'] = 0
-                manual_orders.append(order)
+            service_kind = catalog.get_kind(int(order['service_num']))
+            if service_kind is None:
                 continue
+        except Exception:
+            continue
+
+        # 저장된 검증 결과가 있는 입력은 액터 실행에서 제외
+        if service_kind == 'instagram_follower':
+            if not instagram_profile_validator._is_post_link(url) and not is_stored('instagram_profile', instagram_profile_validator._profile_key(url)):
+                profiles.append(url)
+        elif service_kind in ('instagram_reels', 'instagram_post'):
+            if instagram_post_validator._is_post_link(url):
+                if not is_stored(service_kind, _normalize_link(url)):
+                    posts.append(url)
+            else:
+                latest_kind = 'instagram_latest_reels' if service_kind == 'instagram_reels' else 'instagram_latest_post'
+                if not is_stored(latest_kind, instagram_profile_validator._profile_key(url)):
+                    latest_profiles.append(url)
+        elif service_kind == 'youtube_subscriber':
+            if youtube_channel_validator._is_channel_link(url) and not is_stored('youtube_channel', _normalize_link(url)):
+                channels.append(url)
+        elif service_kind == 'youtube_video':
+            if youtube_video_validator._is_video_link(url) and not is_stored('youtube_video', _normalize_link(url)):
+                videos.append(url)
+        elif service_kind == 'youtube_comment':
+            if youtube_video_validator._is_video_link(url) and youtube_video_validator._is_comment_link(url) and not is_stored('youtube_video', _normalize_link(url)):
+                videos.append(url)
+        elif service_kind == 'youtube_shorts':
+            if youtube_video_validator._is_shorts_link(url) and not is_stored('youtube_shorts', _normalize_link(url)):
+                shorts.append(url)
+
+    # 최신 게시물 조회와 겹치는 아이디는 최신 게시물 조회 쪽에서 한 번만 실행
+    latest_usernames = {instagram_profile_validator._profile_key(url) for url in latest_profiles}
+    profiles = [url for url in profiles if instagram_profile_validator._profile_key(url) not in latest_usernames]
+
+    tasks = [asyncio.ensure_future(coro) for coro in (
+        instagram_profile_validator.validate_profiles(profiles),
+        instagram_profile_validator.validate_profiles(latest_profiles, latest=True),
+        instagram_post_validator.validate_posts(posts),
+        youtube_channel_validator.validate_channels(channels),
+        youtube_video_validator.validate_videos(videos),
+        youtube_video_validator.validate_shorts_list(shorts),
+    )]
+    if reserved is not None:
+        # 배치 작업들이 첫 실행에서 입력을 예약할 때까지 한 번 양보
+        await asyncio.sleep(0)
+        reserved.set()
+    await asyncio.gather(*tasks)
+
+
+@span('check_order_url')
+async def check_order_url(orders,
+            catalog,
+            instagram_profile_validator,
+            instagram_post_validator,
+            youtube_channel_validator,
+            youtube_video_validator,
+            tiktok_validator,
+            twitter_validator):
 
-            service_row = filtered_row.iloc[0]
-            service_name = service_row['서비스이름']
-            
-            # 인스타그램 서비스 처리
-            if '인스타그램' in service_name:
-                if '팔로워' in service_name:
-                    # 팔로워 서비스 검증
-                    order = await validate_instagram_profile(order, instagram_profile_validator)
-                    print('팔로워 서비스 링크 검증결과', order.get('inputUrl'))
-                
-                elif '릴스 조회수' in service_name:
-                    # 릴스 조회수 검증
-                    order = await validate_instagram_reels(order, instagram_profile_validator, instagram_post_validator)
-                    print('릴스 조회수 링크 검증 결과', order.get('inputUrl'))
-                    # print('릴스 조회수')
-                    # print(order)
-                    # print()
-                
-                elif '커스텀 댓글' in service_name:
-                    order['validate_url'] = 0
-                    order['note'] = '커스텀 댓글 주문으로 수동 주문이 필요합니다.'
-                
-                else:
-                    order = await validate_instagram_post(order, instagram_profile_validator, instagram_post_validator)
+    manual_orders = []
+    processed_orders = []
 
-            
-            # 유튜브 서비스 처리
-            elif '유튜브' in service_name:
-                if '구독자' in service_name:
-                    # 구독자 서비스는 채널 검증
-                    order = await validate_youtube_channel(order, youtube_channel_validator, youtube_video_validator)
-                elif '댓글 좋아요' in service_name:
-                    order = await validate_youtube_comment(order, youtube_channel_validator, youtube_video_validator)
-                elif '커뮤니티 좋아요' in service_name:
-                    # 커뮤니티 좋아요 서비스는 URL 형식만 검증
-                    order = await validate_youtube_community(order, youtube_channel_validator, youtube_video_validator)
-                elif '쇼츠' in service_name:
-                    order = await validate_youtube_shorts(order, youtube_channel_validator, youtube_video_validator)
-                else:
-                    # 기타 유튜브 서비스는 동영상 검증
-                    order = await validate_youtube_video(order, youtube_channel_validator, youtube_video_validator)
-            
-            # 틱톡 서비스 처리
-            elif '틱톡' in service_name:
-                # if '팔로워' in service_name:
-                #     is_valid = await tiktok_validator.validate_profile(url)
-                #     order['validate_url'] = 1 if is_valid else 0
-                #     if not is_valid:
-                #         print(f"유효하지 않은 프로필입니다: {url}")
-                # else:
-                #     is_valid = await tiktok_validator.validate_post(url)
-                #     order['validate_url'] = 1 if is_valid else 0
-                #     if not is_valid:
-                #         print(f"유효하지 않은 동영상입니다: {url}")
-                order['validate_url'] = 0
-                order['note'] = '틱톡 서비스 주문입니다.'
+    logger.debug("스크랩 주문 %s", summarize(orders))
 
-            
-            # 트위터 서비스 처리
-            elif '트위터' in service_name:
-                # if '팔로워' in service_name:
-                #     is_valid = await twitter_validator.validate_profile(url)
-                #     order['validate_url'] = 1 if is_valid else 0
-                #     if not is_valid:
-                #         print(f"유효하지 않은 프로필입니다: {url}")
-                # else:
-                #     is_valid = await twitter_validator.validate_post(url)
-                #     order['validate_url'] = 1 if is_valid else 0
-                #     if not is_valid:
-                #         print(f"유효하지 않은 트윗입니다: {url}")
-                order['validate_url'] = 0
-                order['note'] = '트위터 서비스 주문입니다.'
-            
-            # 기타 서비스
-            else:
-                order['validate_url'] = 0
+    # 같은 종류의 입력을 모아 액터를 한 번씩 실행
+    await prefetch_validations(
+        orders,
+        catalog,
+        instagram_profile_validator,
+        instagram_post_validator,
+        youtube_channel_validator,
+        youtube_video_validator
+    )
 
-            if order['validate_url'] == 1:
-                processed_orders.append(order)
-            else:
-                print('미처리 주문')
-                manual_orders.append(order)
-        # print(order)
-        except Exception as e:
-            print(f"주문 처리 중 오류 발생: {url}, 에러: {e}")
-            order['validate_url'] = 0
-            traceback.print_exc()
+    # 주문별 검증을 동시에 실행하되 전체 동시 실행 수는 제한
+    semaphore = asyncio.Semaphore(validation_concurrency)
+
+    async def run_validation(order):
+        async with semaphore:
+            return await validate_order(
+                order,
+                catalog,
+                instagram_profile_validator,
+                instagram_post_validator,
+                youtube_channel_validator,
+                youtube_video_validator,
+                tiktok_validator,
+                twitter_validator
+            )
+
+    results = await asyncio.gather(*(run_validation(order) for order in orders))
+
+    # 스크랩 순서대로 결과 분류 (검증 중 오류가 난 주문은 제외)
+    for order in results:
+        if order is None:
+            continue
+        if order['validate_url'] == 1:
+            processed_orders.append(order)
+        else:
+            logger.info(f"미처리 주문: {order['market_order_num']}")
+            manual_orders.append(order)
 
     # valid_orders = [order for order in processed_orders if order['validate_url'] == 1]
-    print(f"전체 주문 수: {len(orders)}")
-    print(f"유효한 주문 수: {len(processed_orders)}")
-    print(f"수동처리 필요 주문 수: {len(manual_orders)}")
-    print(manual_orders)
+    logger.info(f"전체 주문 수: {len(orders)}")
+    logger.info(f"유효한 주문 수: {len(processed_orders)}")
+    logger.info(f"수동처리 필요 주문 수: {len(manual_orders)}")
+    logger.debug("수동처리 필요 주문: %s", summarize(manual_orders))
     return [processed_orders, manual_orders]
 
 
-def process_order(order_sheets, orders):
-    # API 키 설정
-    store_api = StoreAPI(store_api_key)
+async def wait_until_checked(orders, timeout: float = order_check_timeout, interval: float = 0.2):
+    """클릭한 주문의 체크박스가 모두 선택될 때까지 기다립니다. (최대 timeout초)"""
+    pending = [order for order in orders if order.get("check_element") is not None]
+    deadline = time.monotonic() + timeout
+    while pending:
+        try:
+            pending = [order for order in pending if not order["check_element"].is_selected()]
+        except WebDriverException as e:
+            logger.error(f"체크박스 상태 확인 실패: {e}")
+            return False
+        if not pending:
+            break
+        if time.monotonic() >= deadline:
+            logger.warning(f"체크박스 선택 확인 시간 초과: {[order['market_order_num'] for order in pending]}")
+            return False
+        await asyncio.sleep(interval)
+    return True
+
+
+async def submit_store_order(order):
+    """
+    주문 하나를 스토어에 생성하고 응답을 반환합니다. (원장에 먼저 기록한 뒤 요청)
+    이전 주기에 이미 주문한 건은 다시 주문하지 않고 저장된 응답을 반환합니다.
+    """
+    if order.get("ledger_state"):
+        return order["store_order_num"]
+
+    market_order_num = order["market_order_num"]
+    order_link = order["order_edit_link"] if order["order_edit_link"] != -1 else order["order_link"]
+    # 요청 전에 원장에 먼저 기록 (기록 실패 시 주문하지 않음)
+    order_ledger.begin(order, order_link)
+    try:
+        order_data = await async_store_api.create_order(
+            service_id=order["service_num"],
+            link=order_link,
+            quantity=int(order["quantity"])
+        )
+    except (httpx.ConnectError, httpx.ConnectTimeout):
+        # 요청이 전달되지 않았으므로 다음 주기에 다시 주문
+        order_ledger.discard(market_order_num)
+        raise
+    except httpx.HTTPStatusError as e:
+        if e.response.status_code < 500:
+            order_ledger.discard(market_order_num)
+        # 5xx는 주문 여부를 알 수 없으므로 pending으로 남김
+        raise
+
+    if isinstance(order_data, dict) and order_data.get('order'):
+        order_ledger.mark_placed(market_order_num, order_data)
+    else:
+        # 스토어가 주문 없이 응답 (잔액 부족 등)
+        order_ledger.discard(market_order_num)
+    return order_data
+
+
+def record_placed_order(order_sheets, order, order_data) -> bool:
+    """주문 결과를 시트에 기록하고 체크박스를 클릭합니다. 주문이 생성되어 클릭했으면 True를 반환합니다."""
+    if not (isinstance(order_data, dict) and order_data.get('order')):
+        logger.error(f"주문 생성 실패 응답: {order['market_order_num']}, {order_data}")
+        return False
+    try:
+        logger.info('주문완료' if not order.get("ledger_state") else '이전 주문 이어서 처리')
+        order["store_order_num"] = order_data
+        # 시트에 이미 기록한 주문과 이전 flush 실패로 버퍼에 남은 주문은 다시 기록하지 않음
+        if (order.get("ledger_state") in (None, OrderLedger.PLACED) and
+                str(order['market_order_num']) not in order_sheets.pending_keys()):
+            add_order_sheet(order_sheets, order)
+
+        logger.info(f"생성된 주문: {order_data}")
+        order["check_element"].click()
+        return True
+    except Exception as e:
+        logger.exception(f"주문 기록 중 오류 발생: {order['market_order_num']}, {e}")
+        return False
+
+
+@span('process_order')
+async def process_order(order_sheets, orders):
     cnt = 0
     is_manual_orders = []
     result = [False, orders, is_manual_orders]
-    for order in orders:
-        order_data = None
-        try:
-            # 주문 생성
-            if order["validate_url"] == 1:
-                order_link = order["order_edit_link"] if order["order_edit_link"] != -1 else order["order_link"]
-                order_data = store_api.create_order(
-                    service_id=order["service_num"],
-                    link=order_link,
-                    quantity=int(order["quantity"])
-                )
-                print('주문완료')
-                # order_data = 1
-                order["store_order_num"] = order_data
-                cnt += 1
-                add_order_sheet(order_sheets, order)
-            else:
-                is_manual_orders.append(order)
 
-            print("생성된 주문:", order_data)
-            if order_data and order["validate_url"] == 1:
-                order["check_element"].click()
-            
-        except Exception as e:
-            print(f"오류 발생: {order, e}")
-    time.sleep(10)
+    # 주문 생성 요청은 동시에 보내되 동시 요청 수는 제한
+    semaphore = asyncio.Semaphore(store_order_concurrency)
+
+    async def submit(order):
+        async with semaphore:
+            return await submit_store_order(order)
+
+    valid_orders = [order for order in orders if order["validate_url"] == 1]
+    is_manual_orders.extend(order for order in orders if order["validate_url"] != 1)
+    results = await asyncio.gather(*(submit(order) for order in valid_orders), return_exceptions=True)
+
+    # 시트 기록과 체크박스 클릭은 스크랩 순서대로 처리
+    checked_orders = []
+    for order, order_data in zip(valid_orders, results):
+        if isinstance(order_data, Exception):
+            logger.error(f"주문 생성 중 오류 발생: {order['market_order_num']}, {order_data}")
+            continue
+        if record_placed_order(order_sheets, order, order_data):
+            cnt += 1
+            checked_orders.append(order)
+
+    # 고정 대기 대신 체크박스가 실제로 선택됐는지 확인
+    await wait_until_checked(checked_orders)
     if cnt > 0:
         result = [True, orders, is_manual_orders]
     return result
 
+
+def _order_age_key(order):
+    return str(order.get('order_time', ''))
+
+
+class BalanceBudget:
+    """
+    주기 시작 시 한 번 조회한 스토어 잔액 안에서 주문을 하나씩 승인합니다.
+    - 단가 기준 예상 금액이 남은 잔액보다 크면 거절 (주문에 note 기록)
+    - 이미 주문한 건(원장)과 단가가 없는 서비스는 그대로 승인
+    - 잔액을 조회하지 못했으면 모두 승인
+    """
+    def __init__(self, catalog, balance_info: Optional[dict] = None):
+        self.catalog = catalog
+        self.balance_info = balance_info
+        self.remaining = float(balance_info['balance']) - balance_reserve if balance_info else None
+        self.unknown_rate = []
+
+    @classmethod
+    async def fetch(cls, catalog):
+        try:
+            return cls(catalog, await async_store_api.get_balance())
+        except Exception as e:
+            logger.warning(f"잔액 확인 실패, 잔액 확인 없이 진행: {e}")
+            return cls(catalog)
+
+    def admit(self, order) -> bool:
+        if self.remaining is None or order.get("ledger_state"):
+            return True
+        cost = self.catalog.estimate_cost(int(order['service_num']), order['quantity'])
+        if cost is None:
+            self.unknown_rate.append(order['market_order_num'])
+            return True
+        if cost > self.remaining:
+            order['note'] = f"스토어 잔액 부족으로 수동 주문이 필요합니다. (잔액 {self.balance_info['balance']} {self.balance_info.get('currency', '')})"
+            return False
+        self.remaining -= cost
+        return True
+
+    def report(self):
+        if self.unknown_rate:
+            logger.warning(f"단가가 없어 잔액 확인 없이 주문: {self.unknown_rate}")
+        if self.remaining is not None:
+            logger.info(f"잔액 {self.balance_info['balance']}, 승인 후 남은 예상 잔액 {self.remaining:.4f}")
+
+
+@span('admit_orders_within_balance')
+async def admit_orders_within_balance(orders, catalog):
+    """
+    주기마다 잔액을 한 번 조회하고, 오래된 주문부터 단가 기준 예상 금액이 잔액 안에 드는 주문만 자동 주문합니다.
+    나머지는 수동주문으로 돌립니다. 잔액을 조회할 수 없으면 모든 주문을 그대로 진행합니다.
+    :return: [자동 주문할 주문 목록(스크랩 순서), 잔액 부족으로 수동 처리할 주문 목록]
+    """
+    # 이미 주문한 건은 비용이 들지 않으므로 잔액 조회도 생략
+    if not any(not order.get("ledger_state") for order in orders):
+        return [orders, []]
+
+    budget = await BalanceBudget.fetch(catalog)
+    rejected = {id(order) for order in sorted(orders, key=_order_age_key) if not budget.admit(order)}
+    budget.report()
+
+    admitted_orders = [order for order in orders if id(order) not in rejected]
+    budget_orders = [order for order in orders if id(order) in rejected]
+    logger.info(f"자동 주문 {len(admitted_orders)}건, 잔액 부족 {len(budget_orders)}건")
+    return [admitted_orders, budget_orders]
+
+
+@span('run_order_pipeline')
+async def run_order_pipeline(orders, catalog, order_sheets,
+            instagram_profile_validator,
+            instagram_post_validator,
+            youtube_channel_validator,
+            youtube_video_validator,
+            tiktok_validator,
+            twitter_validator):
+    """
+    검증 -> 주문 -> 시트 기록/체크 단계를 큐로 연결해 동시에 진행합니다.
+    검증은 동시에 진행하되 잔액 승인은 오래된 주문부터 순서대로 하고(앞선 주문의 검증이 끝날 때까지 대기),
+    승인된 주문은 바로 주문합니다. 큐 크기(pipeline_queue_size)로 앞 단계 속도를 제한합니다.
+    주문 하나의 오류는 그 주문만 제외하고, 단계 작업 자체가 실패하면 나머지 단계를 취소하고 예외를 올립니다.
+    모든 단계가 끝나면(배송처리 전) 스크랩 순서로 정리하고 체크박스 선택을 확인합니다.
+    :return: [check_orders (process_order와 같은 형식), 자동 주문 목록, 수동 주문 목록]
+    """
+    validate_queue = asyncio.Queue(maxsize=pipeline_queue_size)
+    submit_queue = asyncio.Queue(maxsize=pipeline_queue_size)
+    record_queue = asyncio.Queue(maxsize=pipeline_queue_size)
+
+    # 이미 주문한 건은 검증 없이 주문 단계로, 결과를 모르는 건은 수동 확인
+    new_orders, resumed_orders, unknown_orders = split_ledger_orders(orders)
+    processed_orders = list(resumed_orders)
+    manual_orders = list(unknown_orders)
+    checked_orders = []
+
+    budget = await BalanceBudget.fetch(catalog) if new_orders else BalanceBudget(catalog)
+
+    # 배치 검증은 뒤에서 진행하고, 예약이 끝나면 바로 주문별 검증 시작
+    reserved = asyncio.Event()
+    prefetch_task = asyncio.ensure_future(prefetch_validations(
+        new_orders,
+        catalog,
+        instagram_profile_validator,
+        instagram_post_validator,
+        youtube_channel_validator,
+        youtube_video_validator,
+        reserved=reserved
+    ))
+    await reserved.wait()
+
+    # 검증이 끝난 결과를 오래된 순서(index)대로 승인하기 위한 대기열
+    validated = {}
+    next_admit = 0
+    admit_lock = asyncio.Lock()
+
+    async def admit_in_order():
+        nonlocal next_admit
+        async with admit_lock:
+            while next_admit in validated:
+                result = validated.pop(next_admit)
+                next_admit += 1
+                # 검증 중 오류가 난 주문은 기존과 같이 제외
+                if result is None:
+                    continue
+                try:
+                    admitted = result['validate_url'] == 1 and budget.admit(result)
+                except Exception as e:
+                    logger.exception(f"잔액 승인 중 오류 발생: {result['market_order_num']}, {e}")
+                    continue
+                if admitted:
+                    processed_orders.append(result)
+                    await submit_queue.put(result)
+                else:
+                    if result['validate_url'] != 1:
+                        logger.info(f"미처리 주문: {result['market_order_num']}")
+                    manual_orders.append(result)
+
+    async def validate_worker():
+        while True:
+            item = await validate_queue.get()
+            if item is None:
+                return
+            index, order = item
+            try:
+                result = await validate_order(
+                    order,
+                    catalog,
+                    instagram_profile_validator,
+                    instagram_post_validator,
+                    youtube_channel_validator,
+                    youtube_video_validator,
+                    tiktok_validator,
+                    twitter_validator
+                )
+            except Exception as e:
+                logger.exception(f"주문 검증 중 오류 발생: {order['market_order_num']}, {e}")
+                result = None
+            validated[index] = result
+            await admit_in_order()
+
+    async def submit_worker():
+        while True:
+            order = await submit_queue.get()
+            if order is None:
+                return
+            try:
+                order_data = await submit_store_order(order)
+            except Exception as e:
+                logger.error(f"주문 생성 중 오류 발생: {order['market_order_num']}, {e}")
+                continue
+            await record_queue.put((order, order_data))
+
+    async def record_worker():
+        # 셀레니움 클릭과 시트 버퍼는 한 작업에서만 다룸
+        while True:
+            item = await record_queue.get()
+            if item is None:
+                return
+            order, order_data = item
+            if record_placed_order(order_sheets, order, order_data):
+                checked_orders.append(order)
+            # 한 묶음이 모이면 다음 주문을 기다리는 동안 기록 (실패한 행은 버퍼에 남아 다음 flush에서 기록)
+            if len(order_sheets) >= order_sheets.chunk_size:
+                try:
+                    await asyncio.to_thread(order_sheets.flush)
+                except Exception as e:
+                    logger.exception(f"{order_sheets.sheet_name} 시트 중간 기록 실패 ({len(order_sheets)}행 대기): {e}")
+
+    validators = [asyncio.ensure_future(validate_worker()) for _ in range(max(1, validation_concurrency))]
+    submitters = [asyncio.ensure_future(submit_worker()) for _ in range(max(1, store_order_concurrency))]
+    recorder = asyncio.ensure_future(record_worker())
+
+    async def feed():
+        for order in resumed_orders:
+            await submit_queue.put(order)
+        # 잔액 승인 우선순위를 위해 오래된 주문부터 검증
+        for index, order in enumerate(sorted(new_orders, key=_order_age_key)):
+            await validate_queue.put((index, order))
+
+        # 앞 단계가 모두 끝난 뒤 다음 단계에 종료 신호 전달
+        for _ in validators:
+            await validate_queue.put(None)
+        await asyncio.gather(*validators)
+        for _ in submitters:
+            await submit_queue.put(None)
+        await asyncio.gather(*submitters)
+        await record_queue.put(None)
+        await recorder
+
+    feeder = asyncio.ensure_future(feed())
+    workers = validators + submitters + [recorder, feeder]
+    try:
+        # 한 단계라도 예외로 끝나면 큐에서 기다리는 다른 단계가 멈추지 않도록 바로 중단
+        done, _ = await asyncio.wait(workers, return_when=asyncio.FIRST_EXCEPTION)
+        for task in done:
+            if not task.cancelled() and task.exception() is not None:
+                raise task.exception()
+    finally:
+        for worker in workers:
+            if not worker.done():
+                worker.cancel()
+        try:
+            await prefetch_task
+        except Exception as e:
+            logger.error(f"배치 검증 오류: {e}")
+
+    budget.report()
+
+    # 배송처리 전 스크랩 순서로 정리
+    position = {id(order): index for index, order in enumerate(orders)}
+    processed_orders.sort(key=lambda order: position[id(order)])
+    manual_orders.sort(key=lambda order: position[id(order)])
+
+    await wait_until_checked(checked_orders)
+    logger.info(f"전체 주문 수: {len(orders)}")
+    logger.info(f"자동 주문 수: {len(checked_orders)}")
+    logger.info(f"수동처리 필요 주문 수: {len(manual_orders)}")
+    check_orders = [bool(checked_orders), processed_orders, []]
+    return [check_orders, processed_orders, manual_orders]
+
+
+def split_ledger_orders(orders):
+    """
+    주문 원장 기준으로 주문을 나눕니다.
+    - 새 주문: 검증부터 진행
+    - 이미 주문한 주문: 검증 없이 스토어 주문번호를 채워 이어서 처리
+    - 결과를 알 수 없는 주문(pending): 중복 주문을 막기 위해 수동 확인
+    """
+    entries = order_ledger.get_many([order['market_order_num'] for order in orders])
+    new_orders, resumed_orders, unknown_orders = [], [], []
+    for order in orders:
+        entry = entries.get(order['market_order_num'])
+        if entry is None:
+            new_orders.append(order)
+        elif entry['state'] == OrderLedger.PENDING:
+            order['validate_url'] = 0
+            order['note'] = '이전 주문 요청 결과를 알 수 없습니다. 스토어 주문 여부 확인이 필요합니다.'
+            unknown_orders.append(order)
+        else:
+            order['validate_url'] = 1
+            order['store_order_num'] = entry['response']
+            order['ledger_state'] = entry['state']
+            resumed_orders.append(order)
+
+    if resumed_orders or unknown_orders:
+        logger.info(f"원장 기준 이어서 처리 {len(resumed_orders)}건, 확인 필요 {len(unknown_orders)}건")
+    return [new_orders, resumed_orders, unknown_orders]
+
+# 스토어 주문 상태 -> 주문 시트 처리상태 (목록에 없는 상태는 그대로 기록)
+STORE_STATUS_LABELS = {
+    'Pending': '배송중',
+    'In progress': '배송중',
+    'Processing': '배송중',
+    'Completed': '완료',
+    'Partial': '부분완료',
+    'Canceled': '취소',
+}
+OPEN_ORDER_STATUS = '배송중'
+
+
+class OrderStatusIndex:
+    """
+    market_store_order_list 시트의 배송중 스토어 주문 색인 (주문 상태 동기화용)
+    - 처음(그리고 reseed_interval마다) 시트 전체를 한 번 읽고, 그 사이에는 마지막으로 읽은 행 다음(꼬리 범위)만 읽습니다.
+    - 처리상태가 배송중이 아닌(최종 상태) 행은 색인에 두지 않습니다.
+    - 처리상태/남은수량/차감금액은 J:L 열이며, 헤더에 남은수량/차감금액이 없으면 적재할 때 채웁니다.
+    """
+    STATUS_COLUMNS = ['처리상태', '남은수량', '차감금액']  # J:L
+    COLUMN_COUNT = 12  # A:L
+
+    def __init__(self, sheet_manager, sheet_name, reseed_interval=3600):
+        self.sheet_manager = sheet_manager
+        self.sheet_name = sheet_name
+        self.reseed_interval = reseed_interval
+        self.open_rows = {}  # 스토어 주문번호 -> (행 번호, 현재 [처리상태, 남은수량, 차감금액])
+        self.row_count = 0  # 헤더 포함 마지막으로 읽은 행 수
+        self.seeded_at = None
+
+    def _add_rows(self, values, first_row):
+        for offset, row in enumerate(values):
+            row = row + [''] * (self.COLUMN_COUNT - len(row))
+            store_order_id = row[1].strip()
+            if row[9] == OPEN_ORDER_STATUS and store_order_id.isdigit():
+                self.open_rows[store_order_id] = (first_row + offset, row[9:12])
+
+    def _seed(self, worksheet):
+        with span('get', 'sheets'):
+            values = worksheet.get('A1:L')
+        header = (values[0] if values else []) + [''] * self.COLUMN_COUNT
+        if header[10:12] != self.STATUS_COLUMNS[1:]:
+            with span('batch_update', 'sheets'):
+                worksheet.batch_update([{'range': 'K1:L1', 'values': [self.STATUS_COLUMNS[1:]]}])
+            logger.info(f"{self.sheet_name} 시트 헤더에 {self.STATUS_COLUMNS[1:]} 열 기록")
+
+        self.open_rows = {}
+        self._add_rows(values[1:], 2)
+        self.row_count = max(len(values), 1)
+        self.seeded_at = time.monotonic()
+        logger.info(f"주문 상태 색인 적재: 배송중 {len(self.open_rows)}건 ({self.row_count}행)")
+
+    def _fetch_tail(self, worksheet):
+        first_row = self.row_count + 1
+        try:
+            with span('get', 'sheets'):
+                values = worksheet.get(f"A{first_row}:L")
+        except gspread.exceptions.APIError as e:
+            # 시트 격자 끝까지 채워져 있으면 다음 행 범위 자체가 없음
+            if 'exceeds grid limits' in str(e):
+                return
+            raise
+        if not values:
+            return
+        self._add_rows(values, first_row)
+        self.row_count += len(values)
+
+    @backoff.on_exception(
+        backoff.expo,
+        (gspread.exceptions.APIError, TransportError, requests.exceptions.RequestException),
+        max_tries=5
+    )
+    def refresh(self):
+        """색인을 최신 상태로 맞춥니다. (필요할 때만 전체, 평소에는 추가된 행만 읽음)"""
+        worksheet = self.sheet_manager.get_worksheet(self.sheet_name)
+        try:
+            if self.seeded_at is None or time.monotonic() - self.seeded_at >= self.reseed_interval:
+                self._seed(worksheet)
+            else:
+                self._fetch_tail(worksheet)
+        except Exception:
+            self.sheet_manager.invalidate_worksheet(self.sheet_name)
+            raise
+
+    def current_statuses(self, store_order_ids):
+        """
+        주어진 주문의 처리상태 셀만 다시 읽어 {스토어 주문번호: 처리상태}로 반환합니다.
+        (처리상태는 사람이 수정할 수 있으므로 기록 직전에 확인)
+        """
+        row_numbers = [self.open_rows[store_order_id][0] for store_order_id in store_order_ids]
+        worksheet = self.sheet_manager.get_worksheet(self.sheet_name)
+        try:
+            with span('batch_get', 'sheets'):
+                ranges = worksheet.batch_get([f"J{row_number}" for row_number in row_numbers])
+        except Exception:
+            self.sheet_manager.invalidate_worksheet(self.sheet_name)
+            raise
+        return {
+            store_order_id: value_range[0][0] if value_range and value_range[0] else ''
+            for store_order_id, value_range in zip(store_order_ids, ranges)
+        }
+
+    def update(self, store_order_id, values):
+        """기록한 값을 색인에 반영합니다. 최종 상태가 되었거나 처리상태가 바뀐 주문은 색인에서 뺍니다."""
+        row_number, _ = self.open_rows[store_order_id]
+        if values[0] == OPEN_ORDER_STATUS:
+            self.open_rows[store_order_id] = (row_number, values)
+        else:
+            del self.open_rows[store_order_id]
+
+
+order_status_index = OrderStatusIndex(sheet_manager, 'market_store_order_list', status_index_reseed_interval)
+
+
+@span('sync_order_statuses')
+async def sync_order_statuses(index=order_status_index):
+    """
+    색인에 있는 배송중인 스토어 주문을 다중 상태 조회로 확인하고,
+    상태가 바뀐 행만 처리상태/남은수량/차감금액(J:L)을 한 번의 batch_update로 기록합니다.
+    """
+    if status_sync_chunk_size <= 0:
+        return 0
+
+    index.refresh()
+    open_rows = index.open_rows
+    if not open_rows:
+        return 0
+
+    semaphore = asyncio.Semaphore(store_order_concurrency)
+
+    async def fetch(order_ids):
+        async with semaphore:
+            return await async_store_api.get_multiple_order_status(order_ids)
+
+    chunks = list(_chunks(list(open_rows), status_sync_chunk_size))
+    results = await asyncio.gather(*(fetch(chunk) for chunk in chunks), return_exceptions=True)
+
+    checked = len(open_rows)
+    changed = {}
+    for chunk, statuses in zip(chunks, results):
+        if isinstance(statuses, Exception):
+            logger.error(f"주문 상태 조회 실패 ({len(chunk)}건): {statuses}")
+            continue
+        for store_order_id in chunk:
+            status = statuses.get(store_order_id) if isinstance(statuses, dict) else None
+            if not status or 'status' not in status:
+                continue
+            new_values = [
+                STORE_STATUS_LABELS.get(status['status'], status['status']),
+                str(status.get('remains', '')),
+                str(status.get('charge', '')),
+            ]
+            if new_values != open_rows[store_order_id][1]:
+                changed[store_order_id] = new_values
+
+    updates = []
+    if changed:
+        # 그 사이 처리상태를 사람이 바꾼 행은 덮어쓰지 않고 색인에서 뺌
+        for store_order_id, current_status in index.current_statuses(list(changed)).items():
+            if current_status != OPEN_ORDER_STATUS:
+                index.update(store_order_id, [current_status, '', ''])
+                del changed[store_order_id]
+
+    if changed:
+        updates = [
+            {'range': f"J{open_rows[store_order_id][0]}:L{open_rows[store_order_id][0]}", 'values': [new_values]}
+            for store_order_id, new_values in changed.items()
+        ]
+        worksheet = index.sheet_manager.get_worksheet(index.sheet_name)
+        try:
+            with span('batch_update', 'sheets'):
+                worksheet.batch_update(updates)
+        except Exception:
+            index.sheet_manager.invalidate_worksheet(index.sheet_name)
+            raise
+        for store_order_id, new_values in changed.items():
+            index.update(store_order_id, new_values)
+
+    logger.info(f"주문 상태 동기화: 배송중 {checked}건 조회, {len(updates)}건 갱신")
+    return len(updates)
+
 # 기존 배송처리
 # def process_es리ip(driver, orders, order_element, alert, wait):
 #     if orders[0]:
@@ -1395,6 +3043,7 @@ def process_order(order_sheets, orders):
 #     return
 
 # 배송처리
+@span('process_eship')
 def process_eship(driver, orders, order_element, alert, wait):
     if orders[0]:
         try:
@@ -1409,73 +3058,182 @@ def process_eship(driver, orders, order_element, alert, wait):
             alert.accept()
 
         except TimeoutException:
-            print("Alert 처리 완료 또는 배송할 주문 없음")
+            logger.info("Alert 처리 완료 또는 배송할 주문 없음")
     return
 
-def alert_manual_orders(hook_url, sheet_manager, orders):
+class ManualOrderNotifier:
+    """
+    수동주문 웹훅 알림
+    - 알림을 보낸 마켓주문번호를 SQLite에 기록해 다음 주기에 다시 보내지 않습니다.
+    - 전송에 성공한 주문만 기록하므로 실패한 주문은 다음 주기에 다시 보냅니다.
+    - httpx 클라이언트는 처음 사용한 이벤트 루프에서 만들어 재사용합니다.
+    """
+    def __init__(self, hook_url, path: str, retention_days: int, timeout: float):
+        self.hook_url = hook_url
+        self.path = path
+        self.retention_days = retention_days
+        self.timeout = timeout
+        self.conn = None
+        self._client = None
+        self._loop = None
+
+    def _connect(self):
+        if self.conn is None:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            self.conn = sqlite3.connect(self.path)
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS manual_alerts (
+                    market_order_num TEXT PRIMARY KEY,
+                    alerted_at REAL NOT NULL
+                )
+            """)
+            self.conn.execute(
+                "DELETE FROM manual_alerts WHERE alerted_at < ?",
+                (time.time() - self.retention_days * 86400,)
+            )
+            self.conn.commit()
+        return self.conn
+
+    def filter_new(self, market_order_nums: list) -> list:
+        """아직 알림을 보내지 않은 마켓주문번호만 반환합니다. (저장소 오류 시 모두 반환)"""
+        try:
+            conn = self._connect()
+            alerted = set()
+            for chunk in _chunks(list(market_order_nums), 500):
+                rows = conn.execute(
+                    f"SELECT market_order_num FROM manual_alerts WHERE market_order_num IN ({','.join('?' * len(chunk))})",
+                    chunk
+                ).fetchall()
+                alerted.update(row[0] for row in rows)
+        except sqlite3.Error as e:
+            logger.error(f"알림 기록 조회 실패: {e}")
+            return list(market_order_nums)
+        return [num for num in market_order_nums if num not in alerted]
+
+    def mark_alerted(self, market_order_nums: list):
+        try:
+            conn = self._connect()
+            now = time.time()
+            conn.executemany(
+                "INSERT OR REPLACE INTO manual_alerts (market_order_num, alerted_at) VALUES (?, ?)",
+                [(num, now) for num in market_order_nums]
+            )
+            conn.commit()
+        except sqlite3.Error as e:
+            logger.error(f"알림 기록 저장 실패: {e}")
+
+    def _get_client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._loop is not loop:
+            self._client = httpx.AsyncClient(timeout=self.timeout)
+            self._loop = loop
+        return self._client
+
+    async def send(self, payload: dict) -> bool:
+        try:
+            with span('manual_alert', 'webhook'):
+                response = await self._get_client().post(self.hook_url, json=payload)
+            logger.info(f"응답 상태 코드: {response.status_code}")
+            logger.debug("응답 본문: %s", summarize(response.text))
+            response.raise_for_status()
+            return True
+        except httpx.HTTPError as e:
+            logger.error(f"수동주문 알림 전송 실패: {e}")
+            return False
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            self._loop = None
+
+manual_order_notifier = ManualOrderNotifier(make_hook_url, manual_alert_store_path, order_ledger_retention_days, manual_alert_timeout)
 
-    df = sheet_manager.get_sheet_data('manual_order_list')
 
+def _manual_alert_payload(order) -> dict:
+    user_info = order.get("order_username").split('\n')
+    return {
+        "order_num": order.get("market_order_num"),
+        "user_id": user_info[2],
+        "username": user_info[0],
+        "order_time": order.get("order_time").split('\n')[1].replace("(", '').replace(")", ''),
+        "order_service": order.get("service_name"),
+    }
+
+
+@span('alert_manual_orders')
+async def alert_manual_orders(hook_url, sheet_manager, orders):
+    """
+    처리필요 상태이면서 아직 알리지 않은 수동주문만 알립니다.
+    digest 모드에서는 주기마다 한 번, 주문 목록을 묶은 payload를 보냅니다.
+    {"count": n, "orders": [{order_num, user_id, username, order_time, order_service}, ...]}
+    """
+    # 처리필요 상태인 주문만 알림 (해당 행의 처리상태만 다시 읽음)
+    pending_order_nums = manual_order_index.pending_order_nums(
+        [order.get("market_order_num") for order in orders]
+    )
+    new_order_nums = set(manual_order_notifier.filter_new(
+        [order.get("market_order_num") for order in orders if order.get("market_order_num") in pending_order_nums]
+    ))
+
+    payloads = []
     for order in orders:
-        order_num = order.get("market_order_num")
-        user_info = order.get("order_username").split('\n')
-        username = user_info[0]
-        user_id = user_info[2]
-        order_time = order.get("order_time").split('\n')[1].replace("(", '').replace(")", '')
-        order_service = order.get("service_name")
-
-        filtered_manual = df[
-            (df['처리상태'] == '처리필요') &  
-            (df['마켓주문번호'] == order_num) 
-        ]
+        if order.get("market_order_num") not in new_order_nums:
+            logger.debug(f"알릴 주문이 아닙니다: {order.get('market_order_num')}")
+            continue
+        try:
+            payloads.append(_manual_alert_payload(order))
+        except (AttributeError, IndexError) as e:
+            logger.error(f"알림 정보 생성 실패: {order.get('market_order_num'), e}")
 
-        if len(filtered_manual) > 0:
-            payload = {
-                "order_num": order_num,
-                "user_id": user_id,
-                "username": username,
-                "order_time": order_time,
-                "order_service": order_service,
-            }
-
-            response = requests.post(url=hook_url, json=payload)
-            print("응답 상태 코드:", response.status_code)
-            print("응답 본문:", response.text)
-            print('알람완료')
-        else:
-            print("알릴 주문이 아닙니다.")
-    print('모든 알림 완료')
+    if not payloads:
+        logger.info('새로 알릴 주문 없음')
+        return
+
+    if manual_alert_mode == 'each':
+        for payload in payloads:
+            if await manual_order_notifier.send(payload):
+                manual_order_notifier.mark_alerted([payload["order_num"]])
+                logger.info('알람완료')
+    elif await manual_order_notifier.send({"count": len(payloads), "orders": payloads}):
+        manual_order_notifier.mark_alerted([payload["order_num"] for payload in payloads])
+        logger.info(f'알람완료 ({len(payloads)}건)')
+    logger.info('모든 알림 완료')
     return 
 
-# 메뉴얼 주문 시트에 입력
+# 메뉴얼 주문 시트에 입력 (새로 입력한 주문 수를 반환)
+@span('add_manual_order')
 def add_manual_order(sheet_manager, orders):
-
-    manual_order_data = sheet_manager.get_sheet_data('manual_order_list')
-    manual_order_sheets = sheet_manager.get_worksheet('manual_order_list')
-
+    added = 0
     try:
-        for order in orders:
-            # 시트에 없을때만 입력하도록 마켓주문번호로 필터
-            is_row = manual_order_data[
-                (manual_order_data['마켓주문번호'] == order.get("market_order_num"))  # 처리상태가 처리필요인 경우만
-            ]
+        # 시트 전체 대신 색인에서 마켓주문번호 확인 (새로 추가된 행만 읽음)
+        manual_order_index.refresh()
+        # 이전 flush에 실패해 버퍼에 남아 있는 행도 이미 입력한 주문으로 취급
+        buffered_order_nums = manual_order_sheet_writer.pending_keys()
 
+        for order in orders:
             # 일치하는 주문이 없을때 새로 추가
-            if len(is_row) == 0:
-                add_manual_order_sheet(manual_order_sheets, order)
-                print('수동주문 시트 입력완료', order['note'])
+            order_num = str(order.get("market_order_num", ''))
+            if order_num not in manual_order_index and order_num not in buffered_order_nums:
+                add_manual_order_sheet(manual_order_sheet_writer, order)
+                buffered_order_nums.add(order_num)
+                added += 1
+                logger.info(f"수동주문 시트 입력완료 {order['note']}")
             else:
-                print('이미 입력한 주문입니다.')
-        print('모든 수동주문 시트 입력완료')
-        return
+                logger.info('이미 입력한 주문입니다.')
+        # 한 번에 기록한 뒤 추가된 행을 색인에 반영 (알림에서 사용)
+        if manual_order_sheet_writer.flush():
+            manual_order_index.refresh()
+        logger.info('모든 수동주문 시트 입력완료')
+        return added
 
     except Exception as e:
-        print(f"시트 추가 중 오류 발생: {str(e)}")
-        traceback.print_exc()
+        logger.exception(f"시트 추가 중 오류 발생: {str(e)}")
+        return added
 
 # 매 단건주문 시트에 입력
 def add_manual_order_sheet(df, order):
-    print('manual_order 입력')
+    logger.info('manual_order 입력')
     try:
         row_data = [
             str(order.get('market_order_num', '')),
@@ -1495,19 +3253,22 @@ def add_manual_order_sheet(df, order):
             raise ValueError(f"Expected 11 columns, got {len(row_data)}")
         
         df.append_row(row_data)
-        print(f"수동주문 정보가 시트에 추가되었습니다: {row_data}")
+        logger.info(f"수동주문 정보가 시트에 추가되었습니다: {row_data}")
         return order
 
     
     except Exception as e:
-        print(f"시트 추가 중 오류 발생: {str(e)}")
-        traceback.print_exc()
+        logger.exception(f"시트 추가 중 오류 발생: {str(e)}")
 
-async def main(logger=None, send_alert=None):
+async def main(logger=logger, send_alert=None):
 
+    cycle_ok = False
+    scraped_count = 0
+    span_recorder.start_cycle()
     try:
-        driver = init_driver()
-        wait = WebDriverWait(driver, timeout=20)
+        # 이전 주기의 브라우저/로그인 세션을 재사용
+        with span('acquire_driver'):
+            driver, wait = driver_manager.acquire()
         alert = Alert(driver)
         # print(f"APIFY_TOKEN: {apify_token[:2]}...")  # 토큰의 앞부분만 출력
         # print(f"ACTOR_INSTA: {actor_insta_profile}")
@@ -1518,13 +3279,16 @@ async def main(logger=None, send_alert=None):
         tiktok_validator = TiktokValidator(apify_token, actor_tiktok)
         twitter_validator = TwitterValidator(apify_token, actor_twitter)
         
-        cafe24_login(driver, login_page, wait)
-        order_list = scrape_orders(driver, order_page, wait)
+        # 서비스 목록이 바뀌었으면 이번 주기 시작 전에 교체
+        with span('refresh_catalog'):
+            catalog = catalog_manager.refresh()
+
+        order_list = scrape_orders(driver, order_page, wait, catalog, navigate=False)
         orders, order_element = order_list
+        scraped_count = len(orders)
         # processed_orders = [{'market_order_num': '20250105-0000216-1', 'order_username': '용재\n\n3861898251@k\n[일반회원]\n주문 : 4건\n(총5건)', 'service_num': '501', 'quantity': '100', 'order_link': 'gpl_lesson_official', 'order_edit_link': -1, 'order_time': '2025-01-05 20:14:18\n(2025-01-05 20:17:10)', 'check_element': '<selenium.webdriver.remote.webelement.WebElement (session="3555437cf1ad124aa13d34bb0ea77f0a", element="f.73AC566FA7743A50BA2144D195C33346.d.0B482F9F6996D3A3930BC0F62C8B5F41.e.625")>', 'store_order_num': {'order': 214952}, 'validate_url': 1}, {'market_order_num': '20250105-0000201-1', 'order_username': '용재\n\n3861898251@k\n[일반회원]\n주문 : 4건\n(총5건)', 'service_num': '32', 'quantity': '1000', 'order_link': 'gpl_lesson_official', 'order_edit_link': 'https://www.instagram.com/p/DEcK4YPpRJL/', 'order_time': '2025-01-05 20:10:25\n(2025-01-05 20:11:41)', 'check_element': '<selenium.webdriver.remote.webelement.WebElement (session="3555437cf1ad124aa13d34bb0ea77f0a", element="f.73AC566FA7743A50BA2144D195C33346.d.0B482F9F6996D3A3930BC0F62C8B5F41.e.186")>', 'store_order_num': {'order': 214953}, 'validate_url': 1}, {'market_order_num': '20250105-0000195-1', 'order_username': '현재현\n\nwogus4802\n[일반회원]\n(총1건)', 'service_num': '441', 'quantity': '100', 'order_link': 'jae_07hyeon', 'order_edit_link': -1, 'order_time': '2025-01-05 20:10:12\n(2025-01-05 20:11:55)', 'check_element': '<selenium.webdriver.remote.webelement.WebElement (session="3555437cf1ad124aa13d34bb0ea77f0a", element="f.73AC566FA7743A50BA2144D195C33346.d.0B482F9F6996D3A3930BC0F62C8B5F41.e.673")>', 'store_order_num': {'order': 214954}, 'validate_url': 1}, {'market_order_num': '20250105-0000172-1', 'order_username': '용재\n\n3861898251@k\n[일반회원]\n주문 : 4건\n(총5건)', 'service_num': '12', 'quantity': '200', 'order_link': 'gpl_lesson_official', 'order_edit_link': 'https://www.instagram.com/p/DEcK4YPpRJL/', 'order_time': '2025-01-05 20:07:48\n(2025-01-05 20:11:41)', 'check_element': '<selenium.webdriver.remote.webelement.WebElement (session="3555437cf1ad124aa13d34bb0ea77f0a", element="f.73AC566FA7743A50BA2144D195C33346.d.0B482F9F6996D3A3930BC0F62C8B5F41.e.698")>', 'store_order_num': {'order': 214955}, 'validate_url': 1}, {'market_order_num': '20250105-0000162-1', 'order_username': '용재\n\n3861898251@k\n[일반회원]\n주문 : 4건\n(총5건)', 'service_num': '441', 'quantity': '600', 'order_link': '_01_6__', 'order_edit_link': -1, 'order_time': '2025-01-05 20:00:02\n(2025-01-05 20:05:50)', 'check_element': '<selenium.webdriver.remote.webelement.WebElement (session="3555437cf1ad124aa13d34bb0ea77f0a", element="f.73AC566FA7743A50BA2144D195C33346.d.0B482F9F6996D3A3930BC0F62C8B5F41.e.723")>', 'store_order_num': {'order': 214956}, 'validate_url': 1}]
         # orders = [{'market_order_num': '20250105-0000037-1', 'order_username': '이아인\n\nain0117\n[일반회원]\n(총1건)', 'service_num': '68', 'quantity': '100', 'order_link': 'https://youtube.com/shorts/aVl7ypCrH78?si=BKuMGN_ptwyum2Vo', 'order_edit_link': -1, 'order_time': '2025-01-05 01:41:23\n(2025-01-05 01:41:23)', 'check_element': '<selenium.webdriver.remote.webelement.WebElement (session="aec1fe2f1114c204a7f38ef7f63781a3", element="f.5A6331A0EC134EFD7F8B5D5C3632D259.d.06E3BCDD94CF186826E1FCE33451DD04.e.641")>', 'store_order_num': -1, 'validate_url': -1}]  # 테스트용 더미 데이터 - 운영 시 주석 처리 필요
-        processed_orders, manual_orders = await check_order_url(
-            orders,
+        validators = (
             instagram_profile_validator,
             instagram_post_validator,
             youtube_channel_validator,
@@ -1532,48 +3296,98 @@ async def main(logger=None, send_alert=None):
             tiktok_validator,
             twitter_validator
         )
+        if order_pipeline_enabled:
+            # 검증이 끝난 주문부터 바로 주문/시트 기록까지 진행
+            check_orders, processed_orders, manual_orders = await run_order_pipeline(
+                orders, catalog, order_sheet_writer, *validators
+            )
+        else:
+            # 이미 주문한 건은 검증을 건너뛰고, 결과를 모르는 건은 수동 확인
+            new_orders, resumed_orders, unknown_orders = split_ledger_orders(orders)
+            processed_orders, manual_orders = await check_order_url(new_orders, catalog, *validators)
+            processed_orders = resumed_orders + processed_orders
+            manual_orders = unknown_orders + manual_orders
+
+            # 잔액 안에서 오래된 주문부터 자동 주문하고 나머지는 수동주문으로
+            processed_orders, budget_orders = await admit_orders_within_balance(processed_orders, catalog)
+            manual_orders = manual_orders + budget_orders
+            check_orders = await process_order(order_sheet_writer, processed_orders)
         # return 
-        print('------------------------')
-        print('자동주문 주문들', processed_orders)
-        print('------------------------')
-        print('수동주문 주문들', manual_orders)
-        print('------------------------')
-        check_orders = process_order(order_sheets, processed_orders)
+        logger.info(f"자동주문 {len(processed_orders)}건, 수동주문 {len(manual_orders)}건")
+        logger.debug("자동주문 주문들 %s", summarize(processed_orders))
+        logger.debug("수동주문 주문들 %s", summarize(manual_orders))
+        # 시트 기록이 실패해도 행은 버퍼에 남겨 다음 flush에서 기록하고 나머지 단계는 진행
+        try:
+            with span('flush_order_sheet'):
+                order_sheet_writer.flush()
+        except Exception as e:
+            logger.exception(f"{order_sheet_writer.sheet_name} 시트 기록 실패 ({len(order_sheet_writer)}행 대기): {e}")
+        placed_order_nums = [
+            order['market_order_num'] for order in processed_orders
+            if isinstance(order.get('store_order_num'), dict) and order['store_order_num'].get('order') not in (None, -1)
+        ]
+
+        # 플랫폼별 주문 수 지표
+        placed = set(placed_order_nums)
+        record_orders('scraped', orders, catalog)
+        record_orders('validated', [order for order in processed_orders + manual_orders if order.get('validate_url') == 1], catalog)
+        record_orders('submitted', [order for order in processed_orders if order['market_order_num'] in placed], catalog)
+        record_orders('manual', manual_orders, catalog)
         # manual_orders = [{'market_order_num': '20250110-0000112-1', 'order_username': '영재♡\n\n3872253150@k\n', 'service_num': '12', 'quantity': '50', 'order_link': 'hajihye1982', 'order_edit_link': 'https://www.instagram.com/p/DBdhEZnPJGj/', 'order_time': '2025-01-10 17:47:09\n(2025-01-10 17:47:09)', 'check_element': '<selenium.webdriver.remote.webelement.WebElement (session="c5a5f80fe20c18214854a7951ab3d715", element="f.57885A121AEF3F82D8E94D602B74ACBE.d.4230DDD31AE8E34A936937FB26074F7B.e.637")>', 'service_name': '인스타그램 한국인 좋아요', 'store_order_num': {'order': 218372}, 'validate_url': 1}, {'market_order_num': '20250110-0000112-2', 'order_username': '영재♡\n\n3872253150@k\n', 'service_num': '441', 'quantity': '50', 'order_link': 'hajihye1982', 'order_edit_link': -1, 'order_time': '2025-01-10 17:47:09\n(2025-01-10 17:47:09)', 'check_element': '<selenium.webdriver.remote.webelement.WebElement (session="c5a5f80fe20c18214854a7951ab3d715", element="f.57885A121AEF3F82D8E94D602B74ACBE.d.4230DDD31AE8E34A936937FB26074F7B.e.659")>', 'service_name': '인스타그램 한국인 팔로워', 'store_order_num': {'order': 218373}, 'validate_url': 1}]
         
+        new_manual_count = 0
         if len(manual_orders) > 0:
-            add_manual_order(sheet_manager, manual_orders)
-            alert_manual_orders(make_hook_url, sheet_manager, manual_orders)
-            print('alert 완')
+            new_manual_count = add_manual_order(sheet_manager, manual_orders)
+            await alert_manual_orders(make_hook_url, sheet_manager, manual_orders)
+            logger.info('alert 완')
         process_eship(driver, check_orders, order_element, alert, wait)
-        print('process_eship 완')
+        logger.info('process_eship 완')
+        if check_orders[0]:
+            order_ledger.mark_state(placed_order_nums, OrderLedger.SHIPPED, (OrderLedger.PLACED, OrderLedger.RECORDED))
         
-        print('check_orders', check_orders)
-        return
+        logger.debug("check_orders %s", summarize(check_orders))
+
+        # 배송중인 스토어 주문 상태를 시트에 반영 (실패해도 주기는 계속)
+        try:
+            await sync_order_statuses()
+        except Exception as e:
+            logger.exception(f"주문 상태 동기화 실패: {e}")
+
+        cycle_ok = True
+        # 스케줄러가 다음 실행 간격을 정할 수 있도록 주기 요약 반환
+        return {
+            'scraped': scraped_count,
+            'placed': len(placed_order_nums),
+            'manual': len(manual_orders),
+            'new_manual': new_manual_count,
+        }
         # return
     except Exception as e:
         error_msg = f"Automation Order critical error occurred: {e}"
 
-        if logger:
-            logger.error(error_msg)
-            logger.error(traceback.format_exc())
-        else:
-            print(f"Error: {e}")
-            traceback.print_exc()
+        logger.exception(error_msg)
 
         if send_alert:
             await send_alert(f"{error_msg}\n\n{traceback.format_exc()}")
             
         return []
     finally:
-        print('완료')
-        driver.quit()
+        logger.info('완료')
+        # 중간 단계에서 예외가 나도 모아 둔 주문 행은 기록
+        flush_sheet_writers()
+        driver_manager.release(cycle_ok)
+        # 단계별 소요 시간/외부 호출 요약
+        span_recorder.finish_cycle(orders=scraped_count, ok=cycle_ok)
         # 비동기 세션 정리
 
 if __name__ == "__main__":
     import asyncio
+    setup_logger()
     loop = asyncio.get_event_loop()
     try:
         orders = loop.run_until_complete(main())
     finally:
+        driver_manager.quit()
+        loop.run_until_complete(async_store_api.aclose())
+        loop.run_until_complete(manual_order_notifier.aclose())
         loop.close()
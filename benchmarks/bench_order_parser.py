@@ -0,0 +1,86 @@
+"""
+주문 목록 파싱 벤치마크 (브라우저 불필요)
+
+저장된 주문 목록 HTML의 tbody를 복제해 10/100/1,000건 주문 페이지를 만들고
+order_parser.parse_order_html 처리 속도(rows/s)를 측정합니다.
+
+사용법:
+    python benchmarks/bench_order_parser.py
+    python benchmarks/bench_order_parser.py --fixture saved_page.html --sizes 10 100 1000 5000
+"""
+import argparse
+import os
+import re
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from order_parser import parse_order_html, parse_order_table  # noqa: E402
+from service_catalog import ServiceCatalog  # noqa: E402
+
+DEFAULT_FIXTURE = os.path.join(ROOT, 'benchmarks', 'fixtures', 'order_list.html')
+TBODY_PATTERN = re.compile(r'<tbody\b.*?</tbody>', re.S | re.I)
+
+
+def build_page(html: str, order_count: int) -> str:
+    """픽스처의 tbody(주문)를 order_count개가 될 때까지 반복해 하나의 페이지로 만듭니다."""
+    tbodies = TBODY_PATTERN.findall(html)
+    if not tbodies:
+        raise ValueError('픽스처에 tbody가 없습니다.')
+
+    repeated = []
+    for i in range(order_count):
+        # 주문번호가 겹치지 않도록 순번을 붙임
+        repeated.append(tbodies[i % len(tbodies)].replace('</a><br>', f'-{i:05d}</a><br>', 1))
+
+    start = html.find(tbodies[0])
+    end = html.rfind(tbodies[-1]) + len(tbodies[-1])
+    return html[:start] + '\n'.join(repeated) + html[end:]
+
+
+def build_catalog(html: str) -> ServiceCatalog:
+    """픽스처에 나오는 상품명/세부선택을 모두 활성 서비스로 등록한 서비스 목록"""
+    rows = {}
+    for order in parse_order_table(html):
+        for row in order['rows']:
+            if row is None or not row['service_text']:
+                continue
+            detail_lines = (row['detail'] or '').split('\n')
+            detail_option = detail_lines[0].split(' : ')[1].strip() if len(detail_lines) > 1 else ''
+            for name in (row['service_text'].split('(P')[0].strip(), row['service_text'].split('(')[0].strip()):
+                rows.setdefault((name, detail_option), len(rows) + 1)
+
+    return ServiceCatalog([
+        {'서비스번호': number, '서비스이름': name, '세부선택': detail_option, '서비스유무': 1}
+        for (name, detail_option), number in rows.items()
+    ])
+
+
+def run(fixture: str, sizes: list, repeat: int):
+    with open(fixture, encoding='utf-8') as f:
+        html = f.read()
+    catalog = build_catalog(html)
+
+    print(f"fixture: {fixture}")
+    print(f"{'orders':>8} {'rows':>8} {'html KB':>9} {'best ms':>9} {'rows/s':>10}")
+    for size in sizes:
+        page = build_page(html, size)
+        best = None
+        rows = 0
+        for _ in range(repeat):
+            started = time.perf_counter()
+            rows = len(parse_order_html(page, catalog))
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        print(f"{size:>8} {rows:>8} {len(page.encode('utf-8')) / 1024:>9.1f} {best * 1000:>9.1f} {rows / best:>10.0f}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='주문 목록 HTML 파싱 벤치마크')
+    parser.add_argument('--fixture', default=DEFAULT_FIXTURE, help='주문 목록 페이지 HTML (driver.page_source 저장본)')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 1000], help='측정할 주문 수')
+    parser.add_argument('--repeat', type=int, default=3, help='크기별 반복 횟수 (최고 기록 사용)')
+    args = parser.parse_args()
+    run(args.fixture, args.sizes, args.repeat)
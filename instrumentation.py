@@ -0,0 +1,197 @@
+"""
+주기별 단계/외부 호출 시간 측정
+
+- span(name): 주기의 단계 (scrape_orders, process_order 등)
+- span(name, dependency): 외부 호출 (apify 액터 실행, store API 요청, sheets 호출)
+  with 문(동기/비동기 코드 모두)이나 데코레이터(동기/비동기 함수)로 사용합니다.
+- 주기가 끝나면 단계별 시간, 외부 호출별 횟수와 p50/p95, 분당 주문 수를 한 줄로 남기고
+  원본 span은 SPAN_DIR에 날짜별 JSONL로 보관합니다. (SPAN_RETENTION_DAYS일 지난 파일은 삭제)
+"""
+import functools
+import glob
+import inspect
+import json
+import math
+import os
+import time
+
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Optional
+
+from log_utils import KST, get_logger
+
+logger = get_logger('instrumentation')
+
+span_dir = os.getenv("SPAN_DIR", "data/spans")
+span_retention_days = int(os.getenv("SPAN_RETENTION_DAYS", "14"))
+
+
+def percentile(values, pct):
+    """nearest-rank 백분위수"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+class SpanRecorder:
+    def __init__(self, span_dir: str, retention_days: int = 14):
+        self.span_dir = span_dir
+        self.retention_days = retention_days
+        self.spans = []
+        self.cycle_id = None
+        self.cycle_started_at = None
+        self._cycle_started = None
+        self.last_summary = None
+        self.span_listeners = []
+        self.cycle_listeners = []
+
+    def add_listener(self, on_span=None, on_cycle=None):
+        """span/주기 요약이 기록될 때마다 호출할 함수를 등록합니다. (예: metrics)"""
+        if on_span:
+            self.span_listeners.append(on_span)
+        if on_cycle:
+            self.cycle_listeners.append(on_cycle)
+
+    def _notify(self, listeners, value):
+        for listener in listeners:
+            try:
+                listener(value)
+            except Exception as e:
+                logger.error(f"span 리스너 오류: {e}")
+
+    def start_cycle(self):
+        now = datetime.now(KST)
+        self.spans = []
+        self.cycle_id = now.strftime('%Y%m%d-%H%M%S')
+        self.cycle_started_at = now
+        self._cycle_started = time.perf_counter()
+
+    def record(self, name: str, dependency: Optional[str], started_at: float, duration: float, ok: bool):
+        item = {
+            'name': name,
+            'dependency': dependency,
+            'started_at': round(started_at, 3),
+            'duration': round(duration, 4),
+            'ok': ok,
+        }
+        self.spans.append(item)
+        self._notify(self.span_listeners, item)
+
+    def summarize(self, orders: int, ok: bool) -> dict:
+        cycle_seconds = time.perf_counter() - self._cycle_started if self._cycle_started else 0.0
+
+        stages = {}
+        calls = {}
+        for item in self.spans:
+            if item['dependency'] is None:
+                stage = stages.setdefault(item['name'], {'count': 0, 'seconds': 0.0})
+                stage['count'] += 1
+                stage['seconds'] += item['duration']
+            else:
+                calls.setdefault(item['dependency'], []).append(item)
+
+        dependencies = {}
+        for dependency, items in calls.items():
+            durations = [item['duration'] for item in items]
+            dependencies[dependency] = {
+                'count': len(items),
+                'errors': sum(1 for item in items if not item['ok']),
+                'seconds': round(sum(durations), 3),
+                'p50': percentile(durations, 50),
+                'p95': percentile(durations, 95),
+                'by_name': dict(Counter(item['name'] for item in items)),
+            }
+
+        return {
+            'cycle_id': self.cycle_id,
+            'ok': ok,
+            'cycle_seconds': round(cycle_seconds, 3),
+            'orders': orders,
+            'orders_per_minute': round(orders / (cycle_seconds / 60), 2) if cycle_seconds > 0 else 0.0,
+            'stages': {name: {'count': v['count'], 'seconds': round(v['seconds'], 3)} for name, v in stages.items()},
+            'dependencies': dependencies,
+        }
+
+    def finish_cycle(self, orders: int = 0, ok: bool = True) -> dict:
+        """주기 요약을 로그로 남기고 span을 파일에 기록합니다."""
+        summary = self.summarize(orders, ok)
+        self.last_summary = summary
+        logger.info(self.format_summary(summary))
+        self._notify(self.cycle_listeners, summary)
+        try:
+            self._write(summary)
+        except OSError as e:
+            logger.error(f"span 기록 실패: {e}")
+        return summary
+
+    @staticmethod
+    def format_summary(summary: dict) -> str:
+        stages = ', '.join(f"{name} {v['seconds']:.1f}s" for name, v in summary['stages'].items())
+        dependencies = ', '.join(
+            f"{name} {v['count']}회(오류 {v['errors']}) p50 {v['p50']:.2f}s p95 {v['p95']:.2f}s"
+            for name, v in summary['dependencies'].items()
+        )
+        return (
+            f"주기 성능 요약: 전체 {summary['cycle_seconds']:.1f}s, 주문 {summary['orders']}건 "
+            f"({summary['orders_per_minute']:.1f}건/분) | 단계: {stages or '-'} | 외부 호출: {dependencies or '-'}"
+        )
+
+    def _write(self, summary: dict):
+        os.makedirs(self.span_dir, exist_ok=True)
+        day = self.cycle_started_at or datetime.now(KST)
+        path = os.path.join(self.span_dir, f"spans-{day:%Y-%m-%d}.jsonl")
+        with open(path, 'a', encoding='utf-8') as f:
+            for item in self.spans:
+                f.write(json.dumps({'type': 'span', 'cycle_id': self.cycle_id, **item}, ensure_ascii=False) + '\n')
+            f.write(json.dumps({'type': 'cycle', **summary}, ensure_ascii=False) + '\n')
+        self._prune()
+
+    def _prune(self):
+        cutoff = f"spans-{datetime.now(KST) - timedelta(days=self.retention_days):%Y-%m-%d}.jsonl"
+        for path in glob.glob(os.path.join(self.span_dir, 'spans-*.jsonl')):
+            if os.path.basename(path) < cutoff:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+
+span_recorder = SpanRecorder(span_dir, span_retention_days)
+
+
+class Span:
+    """with 문 또는 데코레이터로 사용하는 시간 측정 구간"""
+    def __init__(self, name: str, dependency: Optional[str] = None, recorder: SpanRecorder = span_recorder):
+        self.name = name
+        self.dependency = dependency
+        self.recorder = recorder
+
+    def __enter__(self):
+        self._started_at = time.time()
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.recorder.record(self.name, self.dependency, self._started_at,
+                             time.perf_counter() - self._started, exc_type is None)
+        return False
+
+    def __call__(self, func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with Span(self.name, self.dependency, self.recorder):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with Span(self.name, self.dependency, self.recorder):
+                return func(*args, **kwargs)
+        return wrapper
+
+
+def span(name: str, dependency: Optional[str] = None) -> Span:
+    return Span(name, dependency)
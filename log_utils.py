@@ -0,0 +1,170 @@
+"""
+로깅 설정
+
+- 모든 모듈은 get_logger()로 'market_automation_order' 하위 로거를 사용합니다.
+- 로그 레코드는 QueueHandler로 큐에만 넣고, 파일/콘솔 쓰기는 QueueListener 스레드가 합니다.
+  (주문 처리 중에 디스크/표준출력 I/O를 기다리지 않음)
+- LOG_LEVEL: 로그 레벨 (기본 INFO, 주문 목록 등 상세 내용은 DEBUG)
+- LOG_FORMAT=json 이면 한 줄에 JSON 하나씩 기록합니다.
+- LOG_PAYLOAD_LIMIT: summarize()로 남기는 데이터의 최대 글자 수
+"""
+import atexit
+import copy
+import json
+import logging
+import os
+import queue
+import reprlib
+
+from datetime import datetime, time
+from logging.handlers import QueueHandler, QueueListener, TimedRotatingFileHandler
+
+import pytz
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+LOGGER_NAME = 'market_automation_order'
+KST = pytz.timezone('Asia/Seoul')
+
+log_level = os.getenv("LOG_LEVEL", "INFO").upper()
+log_format = os.getenv("LOG_FORMAT", "text").lower()
+log_dir = os.getenv("LOG_DIR", "logs")
+log_payload_limit = int(os.getenv("LOG_PAYLOAD_LIMIT", "500"))
+
+
+def get_logger(module_name):
+    """모듈별 하위 로거 (예: market_automation_order.automation_order)"""
+    return logging.getLogger(f"{LOGGER_NAME}.{module_name}")
+
+
+class KSTFormatter(logging.Formatter):
+    def converter(self, timestamp):
+        return datetime.fromtimestamp(timestamp, KST)
+
+    def formatTime(self, record, datefmt=None):
+        dt = self.converter(record.created)
+        if datefmt:
+            return dt.strftime(datefmt)
+        return dt.strftime('%Y-%m-%d %H:%M:%S')
+
+
+class JsonFormatter(KSTFormatter):
+    """한 줄에 JSON 하나 (time, level, logger, message[, exc_info])"""
+    def format(self, record):
+        entry = {
+            'time': self.converter(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        if record.exc_info:
+            entry['exc_info'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry['exc_info'] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class _Summary:
+    """로그에 실제로 기록될 때만 repr을 만드는 요약 (레벨에 걸러지면 비용 없음)"""
+    _repr = reprlib.Repr()
+    _repr.maxlevel = 3
+    _repr.maxlist = _repr.maxtuple = _repr.maxset = _repr.maxdict = 10
+    _repr.maxstring = _repr.maxother = 200
+
+    def __init__(self, value, limit):
+        self.value = value
+        self.limit = limit
+
+    def __str__(self):
+        value = self.value
+        text = value if isinstance(value, str) else self._repr.repr(value)
+        if len(text) > self.limit:
+            text = f"{text[:self.limit]}...(+{len(text) - self.limit}자)"
+        if isinstance(value, (list, tuple, dict, set)):
+            return f"[{len(value)}건] {text}"
+        return text
+
+
+def summarize(value, limit=None):
+    """주문 목록/데이터셋 등 큰 값을 길이 제한된 요약으로 로그에 남깁니다."""
+    return _Summary(value, limit or log_payload_limit)
+
+
+class _QueueHandler(QueueHandler):
+    """
+    메시지 인자만 합쳐 큐에 넣습니다. (기본 prepare는 traceback까지 메시지에 합쳐 JSON 필드가 사라짐)
+    traceback 문자열은 exc_text로 넘겨 리스너 쪽 포매터가 붙입니다.
+    """
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def _build_formatter():
+    if log_format == 'json':
+        return JsonFormatter()
+    return KSTFormatter('%(asctime)s - %(levelname)s - %(name)s - %(message)s')
+
+
+_listener = None
+
+
+def setup_logger(name=LOGGER_NAME):
+    """name 로거에 QueueHandler를 달고, 파일/콘솔 핸들러는 QueueListener 스레드에서 실행합니다."""
+    global _listener
+    logger = logging.getLogger(name)
+    logger.setLevel(log_level)
+    if _listener is not None:
+        return logger
+
+    os.makedirs(log_dir, exist_ok=True)
+
+    # 파일 핸들러
+    log_file = os.path.join(log_dir, f'{name}.log')
+    file_handler = TimedRotatingFileHandler(
+        log_file,
+        when='midnight',
+        interval=1,
+        backupCount=30,
+        encoding='utf-8',
+        atTime=time(hour=0, minute=0, second=0)
+    )
+    file_handler.suffix = "%Y-%m-%d"
+
+    # 콘솔 핸들러에도 동일한 포매터 적용
+    console_handler = logging.StreamHandler()
+
+    formatter = _build_formatter()
+    file_handler.setFormatter(formatter)
+    console_handler.setFormatter(formatter)
+
+    log_queue = queue.SimpleQueue()
+    logger.addHandler(_QueueHandler(log_queue))
+    logger.propagate = False
+
+    _listener = QueueListener(log_queue, file_handler, console_handler, respect_handler_level=True)
+    _listener.start()
+    return logger
+
+
+def shutdown_logging():
+    """큐에 남은 로그를 모두 기록하고 리스너 스레드를 멈춥니다."""
+    global _listener
+    if _listener is None:
+        return
+    _listener.stop()
+    for handler in _listener.handlers:
+        handler.close()
+    _listener = None
+
+
+# atexit는 등록 역순으로 실행되므로 import 시점에 등록해 두면
+# 다른 모듈의 종료 처리(시트 버퍼 기록 등)가 남긴 로그까지 기록한 뒤 마지막에 종료됨
+atexit.register(shutdown_logging)
@@ -1,78 +1,204 @@
 import asyncio
-import logging
-import pytz
+import hashlib
 import os
+import re
+import time as time_module
 
-from datetime import datetime, timezone, time
-from logging.handlers import TimedRotatingFileHandler
+from collections import deque
+
+from datetime import datetime, timedelta, timezone
 from telegram import Bot
-from automation_order import main
+from automation_order import main, driver_manager, async_store_api, manual_order_notifier, flush_sheet_writers
 from dotenv import load_dotenv
+from log_utils import KST, setup_logger, shutdown_logging
+from metrics import start_metrics_server
 
 load_dotenv()
 
+# 실행 간격 설정 (초)
+# SCHEDULE_WINDOWS: KST 시간대별 최소/최대 간격, "시작시-종료시:최소-최대" 를 쉼표로 구분
+# 예) "9-24:300-1800,0-9:1800-3600" -> 09~24시 5~30분, 00~09시 30~60분
+schedule_default_min = int(os.getenv("SCHEDULE_MIN_INTERVAL", "300"))
+schedule_default_max = int(os.getenv("SCHEDULE_MAX_INTERVAL", "1800"))
+schedule_windows_spec = os.getenv("SCHEDULE_WINDOWS", "")
+# 주문이 없을 때 간격을 늘리는 배수
+schedule_backoff_factor = float(os.getenv("SCHEDULE_BACKOFF_FACTOR", "2"))
+
+
+logger = setup_logger()
+
+class AlertDispatcher:
+    """
+    텔레그램 알림 발송기
+    - Bot(HTTP 세션)을 하나만 만들어 재사용합니다.
+    - 알림은 큐에 넣고 백그라운드 작업에서 보내므로 호출한 쪽은 기다리지 않습니다.
+    - 같은 오류(숫자/주소를 지운 오류 메시지 기준)는 suppress_window 동안 한 번만 보내고,
+      다시 보낼 때 rollup_window 동안 몇 번 발생했는지 함께 보냅니다.
+    - 긴 traceback은 앞뒤만 남겨 잘라 보냅니다.
+    """
+    MAX_MESSAGE_CHARS = 3500  # 텔레그램 메시지 최대 4096자
+
+    def __init__(self, bot_token, chat_id, suppress_window=3600, rollup_window=6 * 3600, queue_size=100):
+        self.bot = Bot(token=bot_token) if bot_token else None  # telegram.Bot이 아닌 Bot으로 사용
+        self.chat_id = chat_id
+        self.suppress_window = suppress_window
+        self.rollup_window = rollup_window
+        self.queue_size = queue_size
+        self.queue = None
+        self.worker = None
+        self.history = {}  # fingerprint -> {'last_sent': 시각, 'occurrences': deque[시각]}
+
+    def start(self):
+        if self.worker is None or self.worker.done():
+            self.queue = asyncio.Queue(maxsize=self.queue_size)
+            self.worker = asyncio.ensure_future(self._run())
+
+    async def send(self, error_message):
+        """알림을 큐에 넣고 바로 반환합니다."""
+        self.start()
+        try:
+            self.queue.put_nowait(str(error_message))
+        except asyncio.QueueFull:
+            logger.error("Telegram 알림 큐가 가득 차 알림을 버립니다.")
+
+    @staticmethod
+    def fingerprint(message):
+        """첫 줄과 마지막 줄(예외)에서 숫자/주소를 지워 같은 오류를 묶습니다."""
+        lines = [line.strip() for line in message.strip().splitlines() if line.strip()]
+        if not lines:
+            return ''
+        key = lines[0] + '|' + lines[-1]
+        key = re.sub(r'0x[0-9a-fA-F]+|\d+', '#', key)
+        return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+    @classmethod
+    def truncate(cls, message):
+        if len(message) <= cls.MAX_MESSAGE_CHARS:
+            return message
+        head = cls.MAX_MESSAGE_CHARS // 3
+        tail = cls.MAX_MESSAGE_CHARS - head
+        return f"{message[:head]}\n...(중략)...\n{message[-tail:]}"
+
+    def _prune(self, now):
+        """억제/집계 기간이 모두 지난 오류 기록을 지웁니다."""
+        cutoff = now - max(self.suppress_window, self.rollup_window)
+        expired = [
+            key for key, entry in self.history.items()
+            if (entry['last_sent'] is None or entry['last_sent'] < cutoff) and
+            (not entry['occurrences'] or entry['occurrences'][-1] < cutoff)
+        ]
+        for key in expired:
+            del self.history[key]
+
+    def _should_send(self, message, now):
+        """보낼 메시지를 반환합니다. 억제 기간 안의 같은 오류면 None"""
+        self._prune(now)
+        entry = self.history.setdefault(self.fingerprint(message), {'last_sent': None, 'occurrences': deque()})
+        occurrences = entry['occurrences']
+        occurrences.append(now)
+        while occurrences and occurrences[0] < now - self.rollup_window:
+            occurrences.popleft()
+
+        if entry['last_sent'] is not None and now - entry['last_sent'] < self.suppress_window:
+            return None
+        entry['last_sent'] = now
+
+        if len(occurrences) > 1:
+            hours = self.rollup_window / 3600
+            message = f"(같은 오류 ×{len(occurrences)}, 최근 {hours:g}시간)\n{message}"
+        return message
+
+    async def _run(self):
+        while True:
+            message = await self.queue.get()
+            try:
+                text = self._should_send(message, time_module.monotonic())
+                if text is None:
+                    logger.info("같은 오류 알림 억제")
+                    continue
+                if self.bot is None:
+                    logger.error("TELEGRAM_BOT_TOKEN이 없어 알림을 보내지 않습니다.")
+                    continue
+                await self.bot.send_message(
+                    chat_id=self.chat_id,
+                    text=f"🚨 에러 발생!\n{self.truncate(text)}"
+                )
+            except Exception as e:
+                logger.error(f"Telegram 알림 전송 실패: {e}")
+            finally:
+                self.queue.task_done()
+
+    async def aclose(self, timeout=10):
+        """남은 알림을 보낼 시간을 잠시 준 뒤 종료합니다."""
+        if self.worker is None:
+            return
+        try:
+            await asyncio.wait_for(self.queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.error("Telegram 알림 일부를 보내지 못하고 종료합니다.")
+        self.worker.cancel()
+        self.worker = None
+        if self.bot is not None:
+            try:
+                await self.bot.shutdown()
+            except Exception:
+                pass
 
-class KSTFormatter(logging.Formatter):
-    def converter(self, timestamp):
-        dt = datetime.fromtimestamp(timestamp)
-        kst = pytz.timezone('Asia/Seoul')
-        return dt.replace(tzinfo=timezone.utc).astimezone(kst)
-
-    def formatTime(self, record, datefmt=None):
-        dt = self.converter(record.created)
-        if datefmt:
-            return dt.strftime(datefmt)
-        return dt.strftime('%Y-%m-%d %H:%M:%S')
-
-def setup_logger(name):
-    logger = logging.getLogger(name)
-    logger.setLevel(logging.INFO)
-
-    log_dir = 'logs'
-    if not os.path.exists(log_dir):
-        os.makedirs(log_dir)
-
-    # 파일 핸들러
-    log_file = os.path.join(log_dir, f'{name}.log')
-    file_handler = TimedRotatingFileHandler(
-        log_file,
-        when='midnight',
-        interval=1,
-        backupCount=30,
-        encoding='utf-8',
-        atTime=time(hour=0, minute=0, second=0)
-    )
-    file_handler.suffix = "%Y-%m-%d"
-    
-    # KST 포매터 적용
-    kst_formatter = KSTFormatter(
-        '%(asctime)s - %(levelname)s - %(message)s'
-    )
-    file_handler.setFormatter(kst_formatter)
-    
-    # 콘솔 핸들러에도 동일한 KST 포매터 적용
-    console_handler = logging.StreamHandler()
-    console_handler.setFormatter(kst_formatter)
-
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
-    
-    return logger
-
-logger = setup_logger('market_automation_order')
+alert_dispatcher = AlertDispatcher(
+    os.getenv("TELEGRAM_BOT_TOKEN"),
+    os.getenv("TELEGRAM_CHAT_ID"),
+    suppress_window=int(os.getenv("ALERT_SUPPRESS_WINDOW", "3600")),
+    rollup_window=int(os.getenv("ALERT_ROLLUP_WINDOW", str(6 * 3600))),
+)
 
 async def send_telegram_alert(error_message):
-    bot_token = os.getenv("TELEGRAM_BOT_TOKEN")
-    chat_id = os.getenv("TELEGRAM_CHAT_ID")
-    
-    try:
-        bot = Bot(token=bot_token)  # telegram.Bot이 아닌 Bot으로 사용
-        await bot.send_message(
-            chat_id=chat_id,
-            text=f"🚨 에러 발생!\n{error_message}"
-        )
-    except Exception as e:
-        logger.error(f"Telegram 알림 전송 실패: {e}")
+    await alert_dispatcher.send(error_message)
+
+def parse_schedule_windows(spec):
+    """ "9-24:300-1800,0-9:1800-3600" -> [(9, 24, 300, 1800), (0, 9, 1800, 3600)] """
+    windows = []
+    for part in filter(None, (p.strip() for p in spec.split(','))):
+        try:
+            hours, bounds = part.split(':')
+            start_hour, end_hour = (int(v) for v in hours.split('-'))
+            min_interval, max_interval = (int(v) for v in bounds.split('-'))
+        except ValueError:
+            logger.error(f"SCHEDULE_WINDOWS 형식 오류, 무시합니다: {part}")
+            continue
+        windows.append((start_hour, end_hour, min_interval, max(min_interval, max_interval)))
+    return windows
+
+schedule_windows = parse_schedule_windows(schedule_windows_spec)
+
+
+def interval_bounds(now_kst):
+    """현재 KST 시각에 해당하는 (최소, 최대) 실행 간격"""
+    for start_hour, end_hour, min_interval, max_interval in schedule_windows:
+        if start_hour <= end_hour:
+            in_window = start_hour <= now_kst.hour < end_hour
+        else:  # 자정을 넘는 구간 (예: 22-6)
+            in_window = now_kst.hour >= start_hour or now_kst.hour < end_hour
+        if in_window:
+            return min_interval, max_interval
+    return schedule_default_min, max(schedule_default_min, schedule_default_max)
+
+
+def next_interval(prev_interval, summary, now_kst):
+    """
+    새로 처리할 주문(이번 주기에 주문했거나 새로 수동주문 시트에 넣은 주문)이 있었으면 최소 간격으로 줄이고,
+    없었으면 배수만큼 늘립니다. (시간대별 범위 안에서)
+    처리하지 못하고 남아 매번 스크랩되는 주문만 있으면 간격을 줄이지 않습니다.
+    주기가 실패해 요약이 없으면 이전 간격을 유지합니다.
+    """
+    min_interval, max_interval = interval_bounds(now_kst)
+    if not isinstance(summary, dict):
+        interval = prev_interval or min_interval
+    elif summary.get('placed') or summary.get('new_manual'):
+        interval = min_interval
+    else:
+        interval = (prev_interval or min_interval) * schedule_backoff_factor
+    return min(max(interval, min_interval), max_interval)
+
 
 async def run_with_retry(max_retries=3):
     for attempt in range(max_retries):
@@ -87,7 +213,21 @@ async def run_with_retry(max_retries=3):
                 raise
 
 async def scheduler():
-    kst = pytz.timezone('Asia/Seoul')
+    # METRICS_PORT가 설정된 경우에만 /metrics, /healthz 제공
+    try:
+        metrics_server = await start_metrics_server()
+    except OSError as e:
+        logger.error(f"metrics 서버 시작 실패: {e}")
+        metrics_server = None
+    try:
+        await run_schedule()
+    finally:
+        if metrics_server is not None:
+            metrics_server.close()
+
+async def run_schedule():
+    kst = KST
+    interval = None
     while True:
         try:
             start_time = datetime.now(timezone.utc).astimezone(kst)
@@ -96,8 +236,15 @@ async def scheduler():
             orders = await run_with_retry()
             logger.info(f"Processed orders: {orders}")
             
-            logger.info(f"Completed execution at {datetime.now(timezone.utc).astimezone(kst)}")
-            await asyncio.sleep(1800)
+            end_time = datetime.now(timezone.utc).astimezone(kst)
+            logger.info(f"Completed execution at {end_time} ({(end_time - start_time).total_seconds():.1f}s)")
+
+            # 다음 실행은 이번 시작 시각 기준 (실행 시간만큼 밀리지 않도록)
+            interval = next_interval(interval, orders, end_time)
+            next_run = start_time + timedelta(seconds=interval)
+            delay = max(0.0, (next_run - datetime.now(timezone.utc).astimezone(kst)).total_seconds())
+            logger.info(f"Next execution at {max(next_run, end_time):%Y-%m-%d %H:%M:%S %Z} (interval {interval:.0f}s)")
+            await asyncio.sleep(delay)
             
         except Exception as e:
             error_msg = f"Automation Order critical error occurred: {e}"
@@ -117,5 +264,13 @@ if __name__ == "__main__":
         logger.error(f"Scheduler stopped due to error: {e}")
         logger.exception("상세 에러:")
     finally:
+        driver_manager.quit()
+        loop.run_until_complete(alert_dispatcher.aclose())
+        # 스토어 API/수동주문 알림 httpx 클라이언트 정리
+        loop.run_until_complete(async_store_api.aclose())
+        loop.run_until_complete(manual_order_notifier.aclose())
+        # 시트 버퍼를 먼저 비워 기록 결과 로그까지 남긴 뒤 로그 리스너 종료
+        flush_sheet_writers()
         logger.info("서비스 종료")
+        shutdown_logging()
         loop.close()
\ No newline at end of file
@@ -0,0 +1,261 @@
+"""
+스케줄러 프로세스 지표 (Prometheus text format)
+
+METRICS_PORT를 설정하면 main.py의 scheduler()가 HTTP 서버를 띄웁니다.
+- GET /metrics : Prometheus 형식 지표
+- GET /healthz : 마지막 주기 결과 (JSON). 마지막 주기가 실패했거나
+                 METRICS_STALE_AFTER초 동안 성공한 주기가 없으면 503
+
+외부 호출 지표는 instrumentation의 span을 받아 집계하므로 호출부를 따로 고치지 않아도 됩니다.
+"""
+import asyncio
+import json
+import os
+import threading
+import time
+
+from log_utils import get_logger
+from instrumentation import span_recorder
+
+logger = get_logger('metrics')
+
+metrics_host = os.getenv("METRICS_HOST", "127.0.0.1")
+metrics_port = int(os.getenv("METRICS_PORT", "0"))  # 0이면 사용하지 않음
+metrics_stale_after = int(os.getenv("METRICS_STALE_AFTER", "7200"))
+
+PREFIX = 'market_order_'
+APIFY_BUCKETS = (1, 2, 5, 10, 20, 30, 60, 120, 300)
+STORE_BUCKETS = (0.1, 0.25, 0.5, 1, 2, 5, 10, 30)
+CYCLE_BUCKETS = (30, 60, 120, 300, 600, 900, 1800)
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _number(value) -> str:
+    value = float(value)
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+def _labels(names, values, extra=None) -> str:
+    pairs = list(zip(names, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+class Metric:
+    def __init__(self, name: str, help_text: str, label_names=()):
+        self.name = PREFIX + name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(str(labels.get(name, '')) for name in self.label_names)
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.type_name}"]
+        with self.lock:
+            for key, value in sorted(self.values.items()):
+                lines.extend(self._render_value(key, value))
+        return lines
+
+    def _render_value(self, key, value) -> list:
+        return [f"{self.name}{_labels(self.label_names, key)} {_number(value)}"]
+
+
+class Counter(Metric):
+    type_name = 'counter'
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    type_name = 'gauge'
+
+    def set(self, value: float, **labels):
+        with self.lock:
+            self.values[self._key(labels)] = value
+
+
+class Histogram(Metric):
+    type_name = 'histogram'
+
+    def __init__(self, name: str, help_text: str, label_names=(), buckets=APIFY_BUCKETS):
+        super().__init__(name, help_text, label_names)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self.lock:
+            entry = self.values.setdefault(key, {'buckets': [0] * len(self.buckets), 'sum': 0.0, 'count': 0})
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    entry['buckets'][i] += 1
+            entry['sum'] += value
+            entry['count'] += 1
+
+    def _render_value(self, key, value) -> list:
+        lines = [
+            f"{self.name}_bucket{_labels(self.label_names, key, ('le', f'{bound:g}'))} {count}"
+            for bound, count in zip(self.buckets, value['buckets'])
+        ]
+        lines.append(f"{self.name}_bucket{_labels(self.label_names, key, ('le', '+Inf'))} {value['count']}")
+        lines.append(f"{self.name}_sum{_labels(self.label_names, key)} {_number(value['sum'])}")
+        lines.append(f"{self.name}_count{_labels(self.label_names, key)} {value['count']}")
+        return lines
+
+
+orders_total = Counter('orders_total', '주문 수 (stage: scraped, validated, submitted, manual)', ('platform', 'stage'))
+apify_run_seconds = Histogram('apify_run_seconds', 'Apify 액터 실행 시간', ('actor',), APIFY_BUCKETS)
+apify_errors_total = Counter('apify_errors_total', 'Apify 액터 실행 오류 수', ('actor',))
+store_request_seconds = Histogram('store_request_seconds', 'StoreAPI 요청 시간', ('action',), STORE_BUCKETS)
+store_errors_total = Counter('store_errors_total', 'StoreAPI 요청 오류 수', ('action',))
+sheets_calls_total = Counter('sheets_calls_total', 'Google Sheets 호출 수', ('method',))
+sheets_errors_total = Counter('sheets_errors_total', 'Google Sheets 호출 오류 수', ('method',))
+cycles_total = Counter('cycles_total', '실행 주기 수', ('outcome',))
+cycle_duration_seconds = Histogram('cycle_duration_seconds', '실행 주기 소요 시간', (), CYCLE_BUCKETS)
+last_cycle_duration_seconds = Gauge('last_cycle_duration_seconds', '마지막 실행 주기 소요 시간')
+last_success_timestamp_seconds = Gauge('last_success_timestamp_seconds', '마지막 성공 주기 종료 시각 (unix time)')
+seconds_since_last_success = Gauge('seconds_since_last_success', '마지막 성공 주기 이후 경과 시간')
+
+ALL_METRICS = (
+    orders_total, apify_run_seconds, apify_errors_total, store_request_seconds, store_errors_total,
+    sheets_calls_total, sheets_errors_total, cycles_total, cycle_duration_seconds,
+    last_cycle_duration_seconds, last_success_timestamp_seconds, seconds_since_last_success,
+)
+
+last_cycle = None  # 마지막 주기 요약 (healthz)
+last_success_at = None
+started_at = time.time()
+
+
+def _on_span(item: dict):
+    dependency = item['dependency']
+    if dependency == 'apify':
+        apify_run_seconds.observe(item['duration'], actor=item['name'])
+        if not item['ok']:
+            apify_errors_total.inc(actor=item['name'])
+    elif dependency == 'store':
+        store_request_seconds.observe(item['duration'], action=item['name'])
+        if not item['ok']:
+            store_errors_total.inc(action=item['name'])
+    elif dependency == 'sheets':
+        sheets_calls_total.inc(method=item['name'])
+        if not item['ok']:
+            sheets_errors_total.inc(method=item['name'])
+
+
+def _on_cycle(summary: dict):
+    global last_cycle, last_success_at
+    now = time.time()
+    last_cycle = {
+        'ok': summary['ok'],
+        'cycle_id': summary['cycle_id'],
+        'finished_at': now,
+        'cycle_seconds': summary['cycle_seconds'],
+        'orders': summary['orders'],
+    }
+    cycles_total.inc(outcome='success' if summary['ok'] else 'failure')
+    cycle_duration_seconds.observe(summary['cycle_seconds'])
+    last_cycle_duration_seconds.set(summary['cycle_seconds'])
+    if summary['ok']:
+        last_success_at = now
+        last_success_timestamp_seconds.set(now)
+
+
+span_recorder.add_listener(on_span=_on_span, on_cycle=_on_cycle)
+
+
+def platform_of(kind) -> str:
+    """classify_service 결과(instagram_post 등)의 플랫폼 부분"""
+    return (kind or 'etc').split('_')[0]
+
+
+def record_orders(stage: str, orders, catalog):
+    """주문 수를 플랫폼별로 집계합니다. stage: scraped, validated, submitted, manual"""
+    for order in orders:
+        # 서비스 목록은 int 서비스번호로 색인되어 있음 (validate_order와 동일)
+        try:
+            kind = catalog.get_kind(int(order['service_num']))
+        except (KeyError, TypeError, ValueError):
+            kind = None
+        orders_total.inc(platform=platform_of(kind), stage=stage)
+
+
+def render() -> str:
+    reference = last_success_at or started_at
+    seconds_since_last_success.set(time.time() - reference)
+    lines = []
+    for metric in ALL_METRICS:
+        lines.extend(metric.render())
+    return '\n'.join(lines) + '\n'
+
+
+def health() -> tuple:
+    """(HTTP 상태 코드, 본문 dict)"""
+    now = time.time()
+    since_success = now - (last_success_at or started_at)
+    body = {
+        'status': 'ok',
+        'last_cycle': last_cycle,
+        'seconds_since_last_success': round(since_success, 1),
+    }
+    if last_cycle is not None and not last_cycle['ok']:
+        body['status'] = 'last_cycle_failed'
+    elif since_success > metrics_stale_after:
+        body['status'] = 'stale'
+    return (200 if body['status'] == 'ok' else 503), body
+
+
+async def _handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    try:
+        request_line = await asyncio.wait_for(reader.readline(), 5)
+        # 헤더는 읽고 버림
+        while True:
+            line = await asyncio.wait_for(reader.readline(), 5)
+            if line in (b'\r\n', b'\n', b''):
+                break
+
+        parts = request_line.decode('latin-1').split()
+        method, path = (parts[0], parts[1].split('?')[0]) if len(parts) >= 2 else ('', '')
+        if method != 'GET':
+            status, content_type, body = 405, 'text/plain', 'method not allowed\n'
+        elif path == '/metrics':
+            status, content_type, body = 200, 'text/plain; version=0.0.4; charset=utf-8', render()
+        elif path in ('/healthz', '/readyz'):
+            status, data = health()
+            content_type, body = 'application/json', json.dumps(data, ensure_ascii=False)
+        else:
+            status, content_type, body = 404, 'text/plain', 'not found\n'
+
+        payload = body.encode('utf-8')
+        reason = {200: 'OK', 404: 'Not Found', 405: 'Method Not Allowed', 503: 'Service Unavailable'}[status]
+        writer.write(
+            f"HTTP/1.1 {status} {reason}\r\nContent-Type: {content_type}\r\n"
+            f"Content-Length: {len(payload)}\r\nConnection: close\r\n\r\n".encode('latin-1') + payload
+        )
+        await writer.drain()
+    except (asyncio.TimeoutError, ConnectionError):
+        pass
+    except Exception as e:
+        logger.error(f"metrics 요청 처리 실패: {e}")
+    finally:
+        writer.close()
+
+
+async def start_metrics_server(host: str = metrics_host, port: int = metrics_port):
+    """METRICS_PORT가 설정되어 있으면 지표 서버를 시작하고 asyncio.Server를 반환합니다."""
+    if not port:
+        return None
+    server = await asyncio.start_server(_handle, host, port)
+    logger.info(f"metrics 서버 시작: http://{host}:{port}/metrics")
+    return server
@@ -0,0 +1,303 @@
+"""
+Cafe24 배송준비중 주문 목록 파싱
+브라우저 없이 주문 테이블 HTML(또는 execute_script 결과)을 주문 목록으로 변환합니다.
+"""
+from html.parser import HTMLParser
+from typing import Optional
+
+import re
+
+from log_utils import get_logger
+
+logger = get_logger('order_parser')
+
+
+# innerText 계산 시 줄바꿈을 만드는 블록 요소
+BLOCK_TAGS = {
+    'address', 'article', 'aside', 'blockquote', 'dd', 'div', 'dl', 'dt', 'fieldset',
+    'figcaption', 'figure', 'footer', 'form', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6',
+    'header', 'hr', 'li', 'main', 'nav', 'ol', 'section', 'table', 'tbody', 'thead',
+    'tfoot', 'tr', 'ul', 'caption',
+}
+# 닫는 태그가 없는 요소
+VOID_TAGS = {
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta',
+    'param', 'source', 'track', 'wbr',
+}
+# 텍스트로 취급하지 않는 요소
+SKIP_TAGS = {'script', 'style', 'template', 'noscript'}
+
+WHITESPACE = re.compile(r'[ \t\r\n\f]+')
+
+
+class Node:
+    """HTML 요소 (태그, 속성, 자식 노드). 텍스트 노드는 문자열로 children에 들어갑니다."""
+    __slots__ = ('tag', 'attrs', 'children', 'parent')
+
+    def __init__(self, tag: str, attrs: dict, parent=None):
+        self.tag = tag
+        self.attrs = attrs
+        self.children = []
+        self.parent = parent
+
+    @property
+    def classes(self) -> set:
+        return set((self.attrs.get('class') or '').split())
+
+    def _matches(self, tag: Optional[str], classes: set, element_id: Optional[str]) -> bool:
+        if tag and self.tag != tag:
+            return False
+        if element_id and self.attrs.get('id') != element_id:
+            return False
+        return classes <= self.classes
+
+    def iter(self):
+        """하위 요소를 문서 순서대로 순회합니다."""
+        for child in self.children:
+            if isinstance(child, Node):
+                yield child
+                yield from child.iter()
+
+    def select(self, selector: str) -> list:
+        """
+        간단한 CSS 선택자로 하위 요소를 찾습니다.
+        태그, .클래스, #아이디 조합과 공백(하위 요소) 결합만 지원합니다. 예) '#shipedReadyList tbody', '.w120.orderNum'
+        """
+        nodes = [self]
+        for part in selector.split():
+            tag, classes, element_id = _parse_compound(part)
+            found = []
+            seen = set()
+            for node in nodes:
+                for child in node.iter():
+                    if id(child) not in seen and child._matches(tag, classes, element_id):
+                        seen.add(id(child))
+                        found.append(child)
+            nodes = found
+        return nodes
+
+    def select_one(self, selector: str):
+        if ' ' not in selector.strip():
+            # 단일 선택자는 첫 번째 일치 요소에서 바로 멈춤
+            tag, classes, element_id = _parse_compound(selector.strip())
+            return next((child for child in self.iter() if child._matches(tag, classes, element_id)), None)
+        found = self.select(selector)
+        return found[0] if found else None
+
+    def inner_text(self) -> str:
+        """브라우저의 innerText와 비슷하게 텍스트를 만듭니다. (<br>, 블록 요소, 표 셀 구분 반영)"""
+        items = []
+        _collect_text(self, items)
+
+        # 연속된 줄바꿈 요구치는 가장 큰 값 하나로 합침
+        parts = []
+        pending = 0
+        for item in items:
+            if isinstance(item, int):
+                pending = max(pending, item)
+                continue
+            # 블록 경계 사이의 공백 텍스트는 무시
+            if item == ' ' and (pending or not parts):
+                continue
+            if pending and parts:
+                parts.append('\n' * pending)
+            pending = 0
+            parts.append(item)
+
+        text = ''.join(parts)
+        lines = [WHITESPACE.sub(' ', line).strip() for line in text.split('\n')]
+        return '\n'.join(lines).strip()
+
+
+def _parse_compound(part: str):
+    element_id = None
+    tokens = re.findall(r'[#.]?[^#.]+', part)
+    tag = None
+    classes = set()
+    for token in tokens:
+        if token.startswith('#'):
+            element_id = token[1:]
+        elif token.startswith('.'):
+            classes.add(token[1:])
+        else:
+            tag = token.lower()
+    return tag, classes, element_id
+
+
+def _is_hidden(node: Node) -> bool:
+    style = (node.attrs.get('style') or '').replace(' ', '').lower()
+    return 'display:none' in style or 'hidden' in node.attrs
+
+
+def _collect_text(node: Node, items: list):
+    for child in node.children:
+        if isinstance(child, str):
+            items.append(WHITESPACE.sub(' ', child))
+            continue
+        if child.tag in SKIP_TAGS or _is_hidden(child):
+            continue
+        if child.tag == 'br':
+            items.append('\n')
+            continue
+
+        breaks = 2 if child.tag == 'p' else 1 if child.tag in BLOCK_TAGS else 0
+        if breaks:
+            items.append(breaks)
+        _collect_text(child, items)
+        if breaks:
+            items.append(breaks)
+        elif child.tag in ('td', 'th'):
+            items.append('\t')
+
+
+class _TreeBuilder(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.root = Node('#document', {})
+        self.stack = [self.root]
+
+    def handle_starttag(self, tag, attrs):
+        node = Node(tag, {key: (value if value is not None else '') for key, value in attrs}, self.stack[-1])
+        self.stack[-1].children.append(node)
+        if tag not in VOID_TAGS:
+            self.stack.append(node)
+
+    def handle_startendtag(self, tag, attrs):
+        node = Node(tag, {key: (value if value is not None else '') for key, value in attrs}, self.stack[-1])
+        self.stack[-1].children.append(node)
+
+    def handle_endtag(self, tag):
+        # 닫히지 않은 태그가 있으면 일치하는 태그까지 닫음
+        for i in range(len(self.stack) - 1, 0, -1):
+            if self.stack[i].tag == tag:
+                del self.stack[i:]
+                return
+
+    def handle_data(self, data):
+        self.stack[-1].children.append(data)
+
+
+def parse_html(html: str) -> Node:
+    builder = _TreeBuilder()
+    builder.feed(html)
+    builder.close()
+    return builder.root
+
+
+def _text(root: Node, selector: str) -> Optional[str]:
+    node = root.select_one(selector)
+    return node.inner_text() if node is not None else None
+
+
+def parse_order_table(html: str) -> list:
+    """
+    주문 목록 페이지 HTML에서 #shipedReadyList 테이블을 읽어 tbody별 데이터로 변환합니다.
+    반환 형식은 automation_order.ORDER_TABLE_SCRIPT의 결과와 같습니다.
+    """
+    root = parse_html(html)
+    order_tables = []
+
+    for tbody in root.select('#shipedReadyList tbody'):
+        rows = []
+        for tr in tbody.select('tr'):
+            option = tr.select_one('.w220.left')
+            if option is None:
+                rows.append(None)
+                continue
+            p = option.select_one('p')
+            links = p.select('a') if p is not None else []
+            rows.append({
+                'service_text': links[1].inner_text() if len(links) > 1 else None,
+                'detail': _text(option, '.etc'),
+                'username': _text(tr, '.w80'),
+                'order_time': _text(tr, '.w65'),
+                'order_num': _text(tr, '.w120.orderNum'),
+                'quantity': _text(tr, '.w30.right'),
+                'has_checkbox': tr.select_one('.chkbox') is not None,
+            })
+        order_tables.append({
+            'username': _text(tbody, '.w80'),
+            'order_time': _text(tbody, '.w65'),
+            'order_num': _text(tbody, '.w120.orderNum'),
+            'rows': rows,
+        })
+
+    return order_tables
+
+
+def get_od_info(order):
+    # print('order', order)
+    order_options = order.split('\n')
+    if len(order_options) > 1:
+        order_service = order_options[0].split(' : ')[1].strip()
+        order_url = order_options[1].split(' : ')[1].strip()
+        return [order_url, order_service]
+    else:
+        order_url = order_options[0].split(' : ')[1].strip()
+        return [order_url, '']
+
+
+def build_order_list(order_tables: list, catalog, make_handle=None) -> list:
+    """
+    주문 테이블 데이터를 주문 목록으로 변환합니다.
+    :param order_tables: list, tbody별 {'username', 'order_time', 'order_num', 'rows'} (행이 주문 행이 아니면 None)
+    :param catalog: ServiceCatalog, 서비스 목록 색인
+    :param make_handle: 체크박스 핸들을 만드는 함수 (tbody 인덱스, 행 인덱스)
+    :return: list, 주문 정보 목록
+    """
+    order_list = []
+
+    for tbody_index, order in enumerate(order_tables):
+        sub_orders = order['rows']
+
+        for i, sub_order in enumerate(sub_orders):
+            if sub_order is None:
+                continue
+
+            order_info = get_od_info(sub_order['detail'])
+
+            if len(sub_orders) == 1:
+                # 단일 주문
+                service_name = sub_order['service_text'].split('(P')[0].strip()
+                market_order_num = sub_order['order_num'].split('\n')[0]
+                order_username = sub_order['username']
+                order_time = sub_order['order_time']
+            else:
+                # 여러 상품 주문은 주문번호 뒤에 순번을 붙임
+                service_name = sub_order['service_text'].split('(')[0].strip()
+                order_num = order['order_num'].split('\n')[0]
+                market_order_num = f"{order_num}-{i+1}"
+                order_username = order['username']
+                order_time = order['order_time']
+
+            # 체크박스가 없으면 주문 후 배송처리 대상으로 선택할 수 없으므로 건너뜀
+            if not sub_order['has_checkbox']:
+                logger.info(f"체크박스가 없는 주문은 건너뜀: {market_order_num}")
+                continue
+            order_chk = make_handle(tbody_index, i) if make_handle else None
+
+            service = catalog.get_service_number(service_name, order_info[1])
+            if service == 0 or service is None:
+                continue
+
+            order_list.append({
+                "market_order_num": market_order_num,
+                "order_username": order_username.split('[')[0],
+                "service_num": str(service),
+                "quantity": sub_order['quantity'].replace(',', ''),
+                "order_link": order_info[0],
+                "order_edit_link": -1,
+                "order_time": order_time.replace('\\n', ', '),
+                "check_element": order_chk,
+                "service_name": service_name,
+                "store_order_num": {'order': -1},
+                "note": '',
+                "validate_url": -1,
+            })
+
+    return order_list
+
+
+def parse_order_html(html: str, catalog, make_handle=None) -> list:
+    """주문 목록 페이지 HTML을 주문 목록으로 변환합니다."""
+    return build_order_list(parse_order_table(html), catalog, make_handle=make_handle)
@@ -0,0 +1,158 @@
+"""
+서비스 목록(market_service_list) 인덱스
+시트를 불러올 때 한 번만 색인해 두고 주문마다 O(1)로 조회합니다.
+"""
+import time
+from typing import Callable, Optional
+
+from log_utils import get_logger
+
+logger = get_logger('service_catalog')
+
+
+def classify_service(service_name: str) -> str:
+    """서비스 이름으로 링크 검증 방식을 분류합니다."""
+    if '인스타그램' in service_name:
+        if '팔로워' in service_name:
+            return 'instagram_follower'
+        if '릴스 조회수' in service_name:
+            return 'instagram_reels'
+        if '커스텀 댓글' in service_name:
+            return 'instagram_custom_comment'
+        return 'instagram_post'
+
+    if '유튜브' in service_name:
+        if '구독자' in service_name:
+            return 'youtube_subscriber'
+        if '댓글 좋아요' in service_name:
+            return 'youtube_comment'
+        if '커뮤니티 좋아요' in service_name:
+            return 'youtube_community'
+        if '쇼츠' in service_name:
+            return 'youtube_shorts'
+        return 'youtube_video'
+
+    if '틱톡' in service_name:
+        return 'tiktok'
+    if '트위터' in service_name:
+        return 'twitter'
+    return 'etc'
+
+
+def _parse_rate(value) -> Optional[float]:
+    if value is None or value == '':
+        return None
+    try:
+        return float(str(value).replace(',', ''))
+    except ValueError:
+        return None
+
+
+class ServiceCatalog:
+    """
+    서비스 목록 색인
+    - (서비스이름, 세부선택) -> 서비스번호 (서비스유무가 1인 서비스만, 시트에서 먼저 나온 행 우선)
+    - 서비스번호 -> 행
+    - 서비스번호 -> 검증 방식 분류 (classify_service)
+    - 서비스번호 -> 단가 (1,000개당 스토어 가격, 단가 열이 없거나 비어 있으면 제외)
+    """
+    RATE_COLUMN = '단가'
+
+    def __init__(self, records: list):
+        self.rows_by_number = {}
+        self.numbers_by_option = {}
+        self.kinds_by_number = {}
+        self.rates_by_number = {}
+
+        for row in records:
+            service_num = row.get('서비스번호')
+            if service_num not in self.rows_by_number:
+                self.rows_by_number[service_num] = row
+                self.kinds_by_number[service_num] = classify_service(str(row.get('서비스이름', '')))
+                rate = _parse_rate(row.get(self.RATE_COLUMN))
+                if rate is not None:
+                    self.rates_by_number[service_num] = rate
+            if row.get('서비스유무') == 1:
+                self.numbers_by_option.setdefault((row.get('서비스이름'), row.get('세부선택')), service_num)
+
+    @classmethod
+    def from_dataframe(cls, df):
+        return cls(df.to_dict('records'))
+
+    def __len__(self):
+        return len(self.rows_by_number)
+
+    def get_service_number(self, service_name: str, detail_option: str):
+        """
+        주어진 서비스 이름과 세부 선택에 일치하는 서비스 번호를 반환합니다.
+        :param service_name: str, 서비스 이름
+        :param detail_option: str, 세부 선택 (비어 있을 수 있음)
+        :return: 일치하는 서비스 번호 (없을 경우 -1 반환)
+        """
+        return self.numbers_by_option.get((service_name, detail_option), -1)
+
+    def get_row(self, service_num) -> Optional[dict]:
+        return self.rows_by_number.get(service_num)
+
+    def get_service_name(self, service_num) -> Optional[str]:
+        """서비스 번호로 서비스 이름을 조회합니다. 목록에 없으면 None을 반환합니다."""
+        row = self.rows_by_number.get(service_num)
+        return row['서비스이름'] if row is not None else None
+
+    def get_kind(self, service_num) -> Optional[str]:
+        return self.kinds_by_number.get(service_num)
+
+    def estimate_cost(self, service_num, quantity) -> Optional[float]:
+        """단가 기준 예상 주문 금액. 단가를 모르면 None을 반환합니다."""
+        rate = self.rates_by_number.get(service_num)
+        if rate is None:
+            return None
+        return rate * int(quantity) / 1000
+
+
+class ServiceCatalogManager:
+    """
+    서비스 목록을 주기 사이에 다시 불러오는 관리자
+    - 리비전(서비스 목록 시트의 리비전 셀 값)을 알 수 있으면 바뀌었을 때만 다시 내려받습니다.
+    - 리비전을 알 수 없으면 refresh_interval(초)이 지났을 때 다시 내려받습니다.
+    - 새 색인을 다 만든 뒤에 교체하므로 주기 도중에는 항상 같은 색인을 사용합니다.
+    """
+    def __init__(self, load: Callable[[], ServiceCatalog],
+                 get_revision: Optional[Callable[[], Optional[str]]] = None,
+                 refresh_interval: float = 600):
+        self.load = load
+        self.get_revision = get_revision
+        self.refresh_interval = refresh_interval
+        self.catalog = None
+        self.revision = None
+        self.loaded_at = 0.0
+
+    def _needs_reload(self, revision) -> bool:
+        if self.catalog is None:
+            return True
+        if revision is not None:
+            return revision != self.revision
+        return time.monotonic() - self.loaded_at >= self.refresh_interval
+
+    def refresh(self, force: bool = False) -> ServiceCatalog:
+        """
+        필요할 때만 서비스 목록을 다시 불러오고 현재 색인을 반환합니다.
+        다시 불러오기에 실패하면 이전 색인을 계속 사용합니다. (처음 불러올 때는 예외 발생)
+        """
+        revision = self.get_revision() if self.get_revision is not None else None
+        if not force and not self._needs_reload(revision):
+            return self.catalog
+
+        try:
+            catalog = self.load()
+        except Exception as e:
+            if self.catalog is None:
+                raise
+            logger.warning(f"서비스 목록 갱신 실패, 이전 목록 사용: {e}")
+            return self.catalog
+
+        self.catalog = catalog
+        self.revision = revision
+        self.loaded_at = time.monotonic()
+        logger.info(f"서비스 목록 갱신: {len(catalog)}개 (revision={revision})")
+        return self.catalog
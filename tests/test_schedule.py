@@ -0,0 +1,50 @@
+"""
+스케줄러 실행 간격(next_interval) 테스트
+
+main.py는 import 시점에 환경 변수로 설정을 읽으므로 필요한 값을 먼저 채워 둡니다.
+"""
+import json
+import os
+import sys
+import tempfile
+
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+for name in ("USERNAME", "PASSWORD", "LOGIN_PAGE", "ORDER_PAGE", "DASHBOARD_PAGE", "SHEET_KEY", "APIFY_TOKEN",
+             "MAKE_HOOK_URL", "ACTOR_PROFILE_INSTA", "ACTOR_POST_INSTA", "ACTOR_YOUTUBE_CHANNEL",
+             "ACTOR_YOUTUBE_VIDEO", "ACTOR_TIKTOK", "ACTOR_TWITTER", "STORE_API_KEY", "STORE_BASIC_URL"):
+    os.environ.setdefault(name, "test")
+os.environ.setdefault("JSON_STR", json.dumps({}))
+os.environ.setdefault("APP_DATA_DIR", tempfile.mkdtemp())
+os.environ["SCHEDULE_WINDOWS"] = ""
+
+import main  # noqa: E402
+
+NOW = main.KST.localize(datetime(2025, 1, 10, 12, 0))
+MIN = main.schedule_default_min
+MAX = main.schedule_default_max
+
+
+def test_new_placed_orders_use_min_interval():
+    summary = {'scraped': 3, 'placed': 1, 'manual': 0, 'new_manual': 0}
+    assert main.next_interval(MAX, summary, NOW) == MIN
+
+
+def test_new_manual_orders_use_min_interval():
+    summary = {'scraped': 2, 'placed': 0, 'manual': 2, 'new_manual': 1}
+    assert main.next_interval(MAX, summary, NOW) == MIN
+
+
+def test_stuck_orders_still_back_off():
+    # 처리하지 못한 주문이 매번 스크랩되어도 새로 처리한 주문이 없으면 간격을 늘림
+    summary = {'scraped': 4, 'placed': 0, 'manual': 4, 'new_manual': 0}
+    interval = main.next_interval(MIN, summary, NOW)
+    assert interval == min(MIN * main.schedule_backoff_factor, MAX)
+    assert main.next_interval(MAX, summary, NOW) == MAX
+
+
+def test_failed_cycle_keeps_interval():
+    assert main.next_interval(600, [], NOW) == 600